@@ -14,7 +14,16 @@ import string
 import time
 import sys
 import os
-import collections
+import re
+import itertools
+import operator
+import array
+import bisect
+import heapq
+import math
+import timeit
+import mmap
+import threading
 
 try:
     from io import StringIO
@@ -22,12 +31,18 @@ except ImportError:
     from io import StringIO
 
 from six import text_type, binary_type, integer_types
+from six.moves import builtins
 
 from . import relativedelta
 from . import tz
+from .tz import _lrucache, _INT64
 
 
-__all__ = ["parse", "parserinfo"]
+__all__ = ["parse", "parse_many", "iterparse", "parse_epoch",
+           "parse_many_epoch", "parse_fields", "parse_many_fields",
+           "parse_buffer", "parse_buffer_many", "timeindex", "inferformat",
+           "search_dates", "isoparse", "parserinfo", "multiparserinfo",
+           "parserstats"]
 
 
 # Some pointers:
@@ -42,16 +57,17 @@ __all__ = ["parse", "parserinfo"]
 
 class _timelex(object):
 
+    wordchars = ('abcdfeghijklmnopqrstuvwxyz'
+                 'ABCDEFGHIJKLMNOPQRSTUVWXYZ_'
+                 ''
+                 '')
+    numchars = '0123456789'
+    whitespace = ' \t\r\n'
+
     def __init__(self, instream):
         if isinstance(instream, text_type):
             instream = StringIO(instream)
         self.instream = instream
-        self.wordchars = ('abcdfeghijklmnopqrstuvwxyz'
-                          'ABCDEFGHIJKLMNOPQRSTUVWXYZ_'
-                          ''
-                          '')
-        self.numchars = '0123456789'
-        self.whitespace = ' \t\r\n'
         self.charstack = []
         self.tokenstack = []
         self.eof = False
@@ -151,6 +167,56 @@ class _timelex(object):
     split = classmethod(split)
 
 
+class _retimelex(object):
+    """Precompiled regex equivalent of _timelex.
+
+    The whole string is tokenized in a single findall() pass, and only
+    the dotted tokens ("a.m.", "10.5.2003", ...) go through the same
+    splitting rules _timelex.get_token applies at the end of each token.
+    """
+
+    _wordclass = "[%s]" % re.escape(_timelex.wordchars)
+    _numclass = "[%s]" % _timelex.numchars
+    _split_re = re.compile(r"(?:%(w)s+|%(n)s+)(?:\.(?:%(w)s+|%(n)s+)?)*|."
+                           % {"w": _wordclass, "n": _numclass}, re.DOTALL)
+
+    def split(cls, s):
+        if not isinstance(s, text_type):
+            s = s.read()
+        if "\x00" in s:
+            s = s.replace("\x00", "")
+        whitespace = _timelex.whitespace
+        numchars = _timelex.numchars
+        tokens = cls._split_re.findall(s)
+        last = len(tokens)-1
+        l = []
+        for i in range(len(tokens)):
+            token = tokens[i]
+            if len(token) == 1:
+                if token in whitespace:
+                    token = ' '
+                l.append(token)
+            elif "." not in token:
+                l.append(token)
+            elif (token.count('.') > 1 or token[-1] == '.' or
+                  token[0] not in numchars or
+                  # _timelex only notices it has seen letters if another
+                  # character is read after them, so "1.a" at the very
+                  # end of the string is kept as a single token.
+                  (token[-1] not in numchars and
+                   (i != last or token[-2] != '.'))):
+                parts = token.split('.')
+                l.append(parts[0])
+                for tok in parts[1:]:
+                    l.append('.')
+                    if tok:
+                        l.append(tok)
+            else:
+                l.append(token)
+        return l
+    split = classmethod(split)
+
+
 class _resultbase(object):
 
     def __init__(self):
@@ -169,6 +235,32 @@ class _resultbase(object):
         return self._repr(self.__class__.__name__)
 
 
+class _tokenroles(object):
+    """What a token stands for, as found by each parserinfo lookup."""
+
+    __slots__ = ["jump", "weekday", "month", "hms", "ampm",
+                 "pertain", "utczone"]
+
+    def __init__(self, jump=False, weekday=None, month=None, hms=None,
+                 ampm=None, pertain=False, utczone=False):
+        self.jump = jump
+        self.weekday = weekday
+        self.month = month
+        self.hms = hms
+        self.ampm = ampm
+        self.pertain = pertain
+        self.utczone = utczone
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__,
+                           ", ".join(["%s=%r" % (attr, getattr(self, attr))
+                                      for attr in self.__slots__]))
+
+# Roles of the tokens not known to the parserinfo. Shared, so never
+# change it.
+_NOROLES = _tokenroles()
+
+
 class parserinfo(object):
 
     # m from a.m/p.m, t from ISO T separator
@@ -212,6 +304,7 @@ class parserinfo(object):
         self._ampm = self._convert(self.AMPM)
         self._utczone = self._convert(self.UTCZONE)
         self._pertain = self._convert(self.PERTAIN)
+        self._roles = self._buildroles()
 
         self.dayfirst = dayfirst
         self.yearfirst = yearfirst
@@ -230,6 +323,46 @@ class parserinfo(object):
                 dct[v.lower()] = i
         return dct
 
+    def _buildroles(self):
+        # One table with everything the lookup methods below would
+        # answer for each known name, so that classify() finds it all
+        # in a single probe. If a subclass overrides any of those
+        # methods, classify() has to go through them instead.
+        for cls in type(self).__mro__:
+            if cls is parserinfo:
+                break
+            for name in _tokenroles.__slots__:
+                if name in cls.__dict__:
+                    return None
+        roles = {}
+        for name in self._names():
+            if name not in roles:
+                roles[name] = self._lookuproles(name)
+        return roles
+
+    def _names(self):
+        # Every name in the word lists, lowercased.
+        return (list(self._jump)+list(self._weekdays)+list(self._months)+
+                list(self._hms)+list(self._ampm)+list(self._pertain)+
+                list(self._utczone))
+
+    def _lookuproles(self, name):
+        return _tokenroles(self.jump(name), self.weekday(name),
+                           self.month(name), self.hms(name),
+                           self.ampm(name), self.pertain(name),
+                           self.utczone(name))
+
+    def classify(self, name):
+        if self._roles is None:
+            return self._lookuproles(name)
+        return self._roles.get(name.lower(), _NOROLES)
+
+    def classifyall(self, names):
+        if self._roles is None:
+            return [self._lookuproles(name) for name in names]
+        get = self._roles.get
+        return [get(name.lower(), _NOROLES) for name in names]
+
     def jump(self, name):
         return name.lower() in self._jump
 
@@ -294,431 +427,2348 @@ class parserinfo(object):
         return True
 
 
+class multiparserinfo(parserinfo):
+    """parserinfo for strings in any of several languages.
+
+    locales is a list of parserinfo instances, from the most to the
+    least preferred. Their words are merged into one index, mapping
+    each name to the set of locales knowing it, as a bit mask. The
+    locale of a string is worked out from its tokens with one lookup
+    each, and the string is then parsed with the words, dayfirst and
+    yearfirst of that locale alone. dayfirst and yearfirst, when not
+    None, override the ones of every locale. The lookup methods of the
+    instance itself answer for the first locale knowing each name.
+    """
+
+    def __init__(self, locales, dayfirst=None, yearfirst=None):
+        self.locales = list(locales)
+        if not self.locales:
+            raise ValueError("no locales given")
+        self.dayfirst = dayfirst
+        self.yearfirst = yearfirst
+        self._year = time.localtime().tm_year
+        self._century = self._year//100*100
+        self._roles = {}
+        self._masks = {}
+        for i, locale in enumerate(self.locales):
+            for name in locale._names():
+                if name not in self._roles:
+                    self._roles[name] = locale.classify(name)
+                self._masks[name] = self._masks.get(name, 0) | 1 << i
+        self._anylocale = (1 << len(self.locales))-1
+
+    def _localeindex(self, tokens):
+        # Index of the first locale knowing all the words of tokens
+        # that some locale knows. Words contradicting the ones before
+        # them are ignored.
+        masks = self._masks
+        found = self._anylocale
+        for token in tokens:
+            mask = masks.get(token.lower())
+            if mask is not None and found & mask:
+                found &= mask
+        # Position of the lowest bit set, without int.bit_length(),
+        # which Python 2.6 lacks.
+        index = 0
+        while not found & 1:
+            found >>= 1
+            index += 1
+        return index
+
+    def jump(self, name):
+        return self.classify(name).jump
+
+    def weekday(self, name):
+        return self.classify(name).weekday
+
+    def month(self, name):
+        return self.classify(name).month
+
+    def hms(self, name):
+        return self.classify(name).hms
+
+    def ampm(self, name):
+        return self.classify(name).ampm
+
+    def pertain(self, name):
+        return self.classify(name).pertain
+
+    def utczone(self, name):
+        return self.classify(name).utczone
+
+    def tzoffset(self, name):
+        for locale in self.locales:
+            offset = locale.tzoffset(name)
+            if offset is not None:
+                return offset
+        return None
+
+
+_MIDNIGHT = datetime.datetime(1, 1, 1)
+
+# Cache lookup marker, for values that may be None.
+_NOTFOUND = object()
+
+# Python 2.6 has no memoryview.
+_memoryview = getattr(builtins, "memoryview", None)
+
+# Bytes-like types parsed through parser._parsebuffer().
+_BUFFERTYPES = tuple(t for t in (binary_type, bytearray, _memoryview)
+                     if t is not None)
+
+# Python 2's re module doesn't take memoryviews.
+try:
+    re.match(b"", _memoryview(b""))
+    _MEMORYVIEWRE = True
+except TypeError:
+    _MEMORYVIEWRE = False
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCHORDINAL = _EPOCH.toordinal()
+
+# Value for the rows that can't be parsed in the epoch arrays. It's
+# numpy's NaT.
+_NAT = -2**63
+
+# Value for the missing fields in the parse_many_fields() columns.
+_NOFIELD = -2**31
+
+def _epoch(dt):
+    # Microseconds since the epoch, in UTC, for dt. Naive datetimes
+    # are taken as UTC.
+    delta = dt.replace(tzinfo=None)-_EPOCH
+    offset = dt.utcoffset()
+    if offset:
+        delta -= offset
+    return (delta.days*86400+delta.seconds)*1000000+delta.microseconds
+
+
+# Field extractors used by parser._scan(). Each one takes the parserinfo,
+# the result being built, the ymd list and the token list, followed by
+# the token indexes it works on.
+
+def _op_hhmm(info, res, ymd, l, i):
+    s = l[i]
+    res.hour = int(s[:2])
+    if len(s) == 4:
+        res.minute = int(s[2:])
+
+def _op_yymmdd(info, res, ymd, l, i):
+    s = l[i]
+    ymd.append(info.convertyear(int(s[:2])))
+    ymd.append(int(s[2:4]))
+    ymd.append(int(s[4:]))
+
+def _op_hhmmss(info, res, ymd, l, i):
+    s = l[i]
+    res.hour = int(s[:2])
+    res.minute = int(s[2:4])
+    res.second, res.microsecond = _parsems(s[4:])
+
+def _op_yyyymmdd(info, res, ymd, l, i):
+    s = l[i]
+    ymd.append(int(s[:4]))
+    ymd.append(int(s[4:6]))
+    ymd.append(int(s[6:]))
+
+def _op_yyyymmddhhmm(info, res, ymd, l, i):
+    s = l[i]
+    ymd.append(int(s[:4]))
+    ymd.append(int(s[4:6]))
+    ymd.append(int(s[6:8]))
+    res.hour = int(s[8:10])
+    res.minute = int(s[10:12])
+    if len(s) == 14:
+        res.second = int(s[12:])
+
+def _op_hour(info, res, ymd, l, i):
+    value = float(l[i])
+    res.hour = int(value)
+    if value%1:
+        res.minute = int(60*(value%1))
+
+def _op_minute(info, res, ymd, l, i):
+    value = float(l[i])
+    res.minute = int(value)
+    if value%1:
+        res.second = int(60*(value%1))
+
+def _op_second(info, res, ymd, l, i):
+    res.second, res.microsecond = _parsems(l[i])
+
+def _op_hourampm(info, res, ymd, l, i, ampmidx):
+    res.hour = int(float(l[i]))
+    ampm = info.classify(l[ampmidx]).ampm
+    if res.hour < 12 and ampm == 1:
+        res.hour += 12
+    elif res.hour == 12 and ampm == 0:
+        res.hour = 0
+
+def _op_ymdvalue(info, res, ymd, l, i):
+    ymd.append(int(float(l[i])))
+
+def _op_ymdint(info, res, ymd, l, i):
+    ymd.append(int(l[i]))
+
+def _op_ymdyear(info, res, ymd, l, i):
+    ymd.append(info.convertyear(int(l[i])))
+
+def _op_ymdmonth(info, res, ymd, l, i):
+    ymd.append(info.classify(l[i]).month)
+
+def _op_weekday(info, res, ymd, l, i):
+    res.weekday = info.classify(l[i]).weekday
+
+def _op_ampm(info, res, ymd, l, i):
+    value = info.classify(l[i]).ampm
+    if value == 1 and res.hour < 12:
+        res.hour += 12
+    elif value == 0 and res.hour == 12:
+        res.hour = 0
+
+def _op_tzname(info, res, ymd, l, i):
+    res.tzname = l[i]
+    res.tzoffset = info.tzoffset(res.tzname)
+
+def _op_tzreverse(info, res, ymd, l, i):
+    l[i] = ('+', '-')[l[i] == '+']
+    res.tzoffset = None
+    if info.classify(res.tzname).utczone:
+        # With something like GMT+3, the timezone
+        # is *not* GMT.
+        res.tzname = None
+
+def _op_tzhhmm(info, res, ymd, l, i):
+    signal = (-1, 1)[l[i] == '+']
+    s = l[i+1]
+    res.tzoffset = (int(s[:2])*3600+int(s[2:])*60)*signal
+
+def _op_tzhh_mm(info, res, ymd, l, i):
+    signal = (-1, 1)[l[i] == '+']
+    res.tzoffset = (int(l[i+1])*3600+int(l[i+3])*60)*signal
+
+def _op_tzhh(info, res, ymd, l, i):
+    signal = (-1, 1)[l[i] == '+']
+    res.tzoffset = int(l[i+1][:2])*3600*signal
+
+def _op_tzabbr(info, res, ymd, l, i):
+    res.tzname = l[i]
+
+def _op_skip(info, res, ymd, l, i):
+    # A token dropped by fuzzy parsing. It's recorded only so that
+    # parserstats can count them.
+    pass
+
+
+class _parsetrace(object):
+    """What a single parser._parse() call went through."""
+
+    __slots__ = ["path", "tokens", "ops", "error"]
+
+    def __init__(self):
+        self.path = None
+        self.tokens = None
+        self.ops = None
+        self.error = None
+
+
+class parserstats(object):
+    """Measurements aggregated over the _parse() calls of a parser.
+
+    Latencies go to a histogram of power of two microsecond buckets,
+    and the number of tokens to one bucket per count. The path counts
+    tell how strings were resolved (epoch, iso, replay of a known
+    shape, scan, and the streamparser and formatparser paths), and ops
+    how many tokens each _op_* extractor resolved. errors counts the
+    exceptions that made the token cascade give up. The keep slowest
+    strings are kept, with their latency, in slowest.
+
+    A parserstats isn't thread safe. Override record() to look at each
+    call as it's made.
+    """
+
+    def __init__(self, keep=10, timer=timeit.default_timer):
+        self.keep = keep
+        self.timer = timer
+        self._trace = None
+        self.clear()
+
+    def clear(self):
+        self.calls = self.failures = self.fuzzy = 0
+        self.seconds = 0.0
+        self.latency = {}
+        self.tokens = {}
+        self.paths = {}
+        self.ops = {}
+        self.errors = {}
+        self._slowest = []
+
+    def _measure(self, parse, timestr, dayfirst, yearfirst, fuzzy, epoch):
+        # Calls parse with a fresh trace, which the _parse() methods
+        # fill in as they go.
+        self._trace = trace = _parsetrace()
+        timer = self.timer
+        start = timer()
+        try:
+            res = parse(timestr, dayfirst, yearfirst, fuzzy, epoch)
+        finally:
+            elapsed = timer()-start
+            self._trace = None
+        self.record(timestr, elapsed, res, fuzzy, trace)
+        return res
+
+    def record(self, timestr, elapsed, res, fuzzy, trace):
+        self.calls += 1
+        self.seconds += elapsed
+        if res is None:
+            self.failures += 1
+        bucket = 2**math.frexp(elapsed*1e6)[1]
+        self.latency[bucket] = self.latency.get(bucket, 0)+1
+        if trace.tokens is not None:
+            self.tokens[trace.tokens] = self.tokens.get(trace.tokens, 0)+1
+        if trace.path is not None:
+            self.paths[trace.path] = self.paths.get(trace.path, 0)+1
+        if trace.ops:
+            ops = self.ops
+            for op, args in trace.ops:
+                if op is _op_skip:
+                    self.fuzzy += 1
+                    continue
+                name = op.__name__[4:]
+                ops[name] = ops.get(name, 0)+1
+        if trace.error is not None:
+            self.errors[trace.error] = self.errors.get(trace.error, 0)+1
+        if self.keep:
+            item = (elapsed, timestr)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+
+    def slowest(self):
+        """The slowest strings seen, as (seconds, string), slowest first."""
+        return sorted(self._slowest, reverse=True)
+
+    def export(self):
+        """Everything measured, as a dict of plain types.
+
+        Histograms are lists of (bucket, count) pairs, latency buckets
+        being the upper bound in microseconds.
+        """
+        return {"calls": self.calls,
+                "failures": self.failures,
+                "fuzzy": self.fuzzy,
+                "seconds": self.seconds,
+                "latency": sorted(self.latency.items()),
+                "tokens": sorted(self.tokens.items()),
+                "paths": dict(self.paths),
+                "ops": dict(self.ops),
+                "errors": dict(self.errors),
+                "slowest": self.slowest()}
+
+    def __repr__(self):
+        return "%s(calls=%d, failures=%d, seconds=%f)" % (
+               self.__class__.__name__, self.calls, self.failures,
+               self.seconds)
+
+
 class parser(object):
 
-    def __init__(self, info=None):
+    # Lexer used by _parse(). Set it to _timelex to go back to the
+    # original character at a time tokenizer.
+    _lexer = _retimelex
+
+    # Bound for the shape caches used by _parse().
+    _SHAPECACHESIZE = 1000
+
+    _MONTHSHAPE = 0
+    _WEEKDAYSHAPE = 1
+
+    def __init__(self, info=None, cachesize=0, tzcachesize=0, stats=None):
         self.info = info or parserinfo()
+        # Optional parserstats, measuring each _parse() call.
+        self.stats = stats
+        # Optional LRU cache of parse() results. See _cachedparse().
+        self.cache = _lrucache(cachesize) if cachesize else None
+        # Optional LRU cache of the tzinfo found for each tzinfos,
+        # tzname and tzoffset. See _tzinfo().
+        self.tzcache = _lrucache(tzcachesize) if tzcachesize else None
+        # _lrucache isn't thread safe, and parsers are often shared
+        # between threads, so both caches are used under this lock.
+        self._cachelock = threading.Lock()
+        self._compiled = {}
+        self._shapecodes = {}
+        # One plain parser per locale of a multiparserinfo.
+        self._localeparsers = None
+        if isinstance(self.info, multiparserinfo):
+            self._localeparsers = [parser(locale)
+                                   for locale in self.info.locales]
+        self._isofastpath = self._isocompatible()
+        # Whether parse() may turn ISO-8601 strings into datetimes
+        # itself. Subclasses and other parserinfos may change what
+        # _parse() and _build() do with them.
+        self._isodirect = (self._isofastpath and type(self) is parser and
+                           type(self.info) is parserinfo)
 
     def parse(self, timestr, default=None,
                     ignoretz=False, tzinfos=None,
                     **kwargs):
+        if (self._isodirect and type(timestr) is text_type and
+            default is None and tzinfos is None and not kwargs and
+            self.cache is None and self.tzcache is None and
+            self.stats is None):
+            ret = self._isodatetime(timestr, ignoretz)
+            if ret is not None:
+                return ret
+        if self.cache is not None:
+            return self._cachedparse(timestr, default, ignoretz, tzinfos,
+                                     kwargs)
+        res = self._parse(timestr, **kwargs)
+        if res is None:
+            raise ValueError("unknown string format")
+        return self._build(res, default, ignoretz, tzinfos)
+
+    def _cachedparse(self, timestr, default, ignoretz, tzinfos, kwargs):
+        if not default:
+            # The result may depend on the current date, so take it
+            # here and make it part of the key.
+            default = datetime.datetime.combine(datetime.date.today(),
+                                                datetime.time())
+        key = (timestr, default, ignoretz, tzinfos)
+        if getattr(default, "tzinfo", None) is not None:
+            # Aware defaults compare equal when they're the same
+            # instant, whatever their fields, so key on the wall clock
+            # and the tzinfo instead. The tzinfos of this package aren't
+            # hashable on Python 3, so those results aren't cached.
+            key = (timestr, default.replace(tzinfo=None), default.tzinfo,
+                   ignoretz, tzinfos)
+        if kwargs:
+            key += tuple(kwargs.items())
+        try:
+            with self._cachelock:
+                ret = self.cache.get(key)
+        except TypeError:
+            # Unhashable tzinfos (a dict, usually) or options, so
+            # there's no safe key.
+            ret = None
+            key = None
+        if ret is None:
+            res = self._parse(timestr, **kwargs)
+            if res is None:
+                raise ValueError("unknown string format")
+            ret = self._build(res, default, ignoretz, tzinfos)
+            if key is not None:
+                with self._cachelock:
+                    self.cache[key] = ret
+        return ret
+
+    def parse_many(self, timestrs, default=None,
+                         ignoretz=False, tzinfos=None,
+                         errors="raise", generator=False,
+                         workers=None, chunksize=1000,
+                         **kwargs):
+        if workers:
+            results = self._parallelparse(timestrs, default, ignoretz,
+                                          tzinfos, errors, kwargs,
+                                          workers, chunksize)
+        else:
+            results = self._iterparse(enumerate(timestrs), None, default,
+                                      ignoretz, tzinfos, errors, kwargs)
+            results = (ret for i, ret in results)
+        if generator:
+            return results
+        return list(results)
+
+    def iterparse(self, fileobj, column=None, sep=None, default=None,
+                        ignoretz=False, tzinfos=None, errors="raise",
+                        chunksize=65536, **kwargs):
+        if hasattr(fileobj, "read"):
+            lines = self._readlines(fileobj, chunksize)
+        else:
+            lines = iter(fileobj)
+        return self._iterparse(enumerate(lines, 1),
+                               self._selector(column, sep), default,
+                               ignoretz, tzinfos, errors, kwargs)
+
+    def _readlines(self, fileobj, chunksize):
+        # Like iterating over fileobj, but reading it in big chunks, so
+        # that unbuffered files and sockets are handled efficiently too.
+        read = fileobj.read
+        tail = None
+        while True:
+            chunk = read(chunksize)
+            if not chunk:
+                break
+            if tail:
+                chunk = tail+chunk
+            if isinstance(chunk, binary_type):
+                lines = chunk.split(b"\n")
+            else:
+                lines = chunk.split("\n")
+            tail = lines.pop()
+            for line in lines:
+                yield line
+        if tail:
+            yield tail
+
+    def _selector(self, column, sep):
+        # Returns a function extracting the timestamp from a line, or
+        # None if the whole line should be parsed.
+        if column is None:
+            return None
+        if isinstance(column, tuple):
+            start, end = column
+            def select(line):
+                return line[start:end]
+        elif isinstance(column, integer_types):
+            seps = {}
+            if sep is None:
+                seps[text_type] = seps[binary_type] = None
+            elif isinstance(sep, binary_type):
+                seps[binary_type], seps[text_type] = sep, sep.decode()
+            else:
+                seps[text_type], seps[binary_type] = sep, sep.encode()
+            maxsplit = column+1 if column >= 0 else -1
+            def select(line):
+                try:
+                    return line.split(seps[type(line)], maxsplit)[column]
+                except IndexError:
+                    raise ValueError("line has no column %d" % column)
+        elif hasattr(column, "search"):
+            group = 1 if column.groups else 0
+            def select(line):
+                m = column.search(line)
+                if m is None:
+                    raise ValueError("line doesn't match the pattern")
+                return m.group(group)
+        else:
+            raise TypeError("column must be a (start, end) tuple, "
+                            "an int or a compiled regular expression")
+        return select
+
+    def parse_buffer(self, buf, start=0, end=None, default=None,
+                           ignoretz=False, tzinfos=None, **kwargs):
+        if end is None:
+            end = len(buf)
+        res = self._parsebuffer(buf, start, end, **kwargs)
+        if res is None:
+            raise ValueError("unknown string format")
+        return self._build(res, default, ignoretz, tzinfos)
+
+    def parse_buffer_many(self, buf, spans, default=None,
+                                ignoretz=False, tzinfos=None,
+                                errors="raise", generator=False,
+                                **kwargs):
+        items = ((i, (buf, start, end))
+                 for i, (start, end) in enumerate(spans))
+        results = self._iterparse(items, None, default, ignoretz,
+                                  tzinfos, errors, kwargs)
+        results = (ret for i, ret in results)
+        if generator:
+            return results
+        return list(results)
+
+    def timeindex(self, fileobj, column=None, sep=None, recordsep=b"\n",
+                        default=None, ignoretz=False, tzinfos=None,
+                        errors="coerce", missing=None, **kwargs):
+        if not recordsep:
+            raise ValueError("recordsep must not be empty")
+        if isinstance(fileobj, (text_type, binary_type)):
+            f = open(fileobj, "rb")
+            try:
+                return self.timeindex(f, column, sep, recordsep, default,
+                                      ignoretz, tzinfos, errors, missing,
+                                      **kwargs)
+            finally:
+                f.close()
+        times = array.array(_INT64)
+        offsets = array.array(_INT64)
+        size = os.fstat(fileobj.fileno()).st_size
+        if not size:
+            return times, offsets
+        m = mmap.mmap(fileobj.fileno(), size, access=mmap.ACCESS_READ)
+        try:
+            items = ((start, (start, end)) for start, end
+                     in self._records(m, recordsep))
+            for offset, ret in self._iterparse(items,
+                                               self._spanselector(m, column,
+                                                                  sep),
+                                               default, ignoretz, tzinfos,
+                                               errors, kwargs,
+                                               self._buildepoch):
+                if ret is None:
+                    if missing is None:
+                        continue
+                    ret = missing
+                times.append(ret)
+                offsets.append(offset)
+        finally:
+            m.close()
+        return times, offsets
+
+    def _records(self, buf, recordsep):
+        # Yields the (start, end) offsets of the records in buf.
+        find = buf.find
+        size = len(buf)
+        pos = 0
+        while pos < size:
+            end = find(recordsep, pos)
+            if end == -1:
+                end = size
+            yield pos, end
+            pos = end+len(recordsep)
+
+    def _spanselector(self, buf, column, sep):
+        # Like _selector(), but for (start, end) records of buf, and
+        # returning the (buf, start, end) of the timestamp.
+        if column is None:
+            def select(span):
+                return (buf,)+span
+        elif isinstance(column, tuple):
+            first, last = column
+            def select(span):
+                start, end = span
+                return buf, start+first, min(start+last, end)
+        elif isinstance(column, integer_types):
+            if column < 0:
+                raise ValueError("column must not be negative")
+            if sep is None:
+                search = _FIELD_BRE.search
+                def select(span):
+                    start, end = span
+                    for i in range(column+1):
+                        m = search(buf, start, end)
+                        if m is None:
+                            raise ValueError("record has no column %d"
+                                             % column)
+                        start = m.end()
+                    return buf, m.start(), start
+            else:
+                if isinstance(sep, text_type):
+                    sep = sep.encode()
+                find = buf.find
+                def select(span):
+                    start, end = span
+                    for i in range(column):
+                        start = find(sep, start, end)
+                        if start == -1:
+                            raise ValueError("record has no column %d"
+                                             % column)
+                        start += len(sep)
+                    stop = find(sep, start, end)
+                    if stop == -1:
+                        stop = end
+                    return buf, start, stop
+        elif hasattr(column, "search"):
+            group = 1 if column.groups else 0
+            def select(span):
+                m = column.search(buf, span[0], span[1])
+                if m is None:
+                    raise ValueError("record doesn't match the pattern")
+                return (buf,)+m.span(group)
+        else:
+            raise TypeError("column must be a (start, end) tuple, "
+                            "an int or a compiled regular expression")
+        return select
+
+    def search_dates(self, text, default=None, ignoretz=False,
+                           tzinfos=None, **kwargs):
+        default = self._batchdefault(default, "raise")
+        tzcache = {}
+        found = []
+        for start, end in self._searchregions(text):
+            l = self._lexer.split(text[start:end])
+            offsets = [start]
+            for token in l:
+                offsets.append(offsets[-1]+len(token))
+            kinds = [self._searchkind(token) for token in l]
+            firstend = self._searchevidence(l, kinds)
+            if firstend[0] == len(l):
+                continue
+            i = runend = 0
+            while i < len(l):
+                if runend <= i:
+                    runend = i
+                    while runend < len(l) and kinds[runend] is not None:
+                        runend += 1
+                if kinds[i] in ("number", "month", "weekday"):
+                    # Longest date starting here, if any.
+                    for j in range(min(runend, i+self._SEARCHMAXTOKENS),
+                                   i, -1):
+                        if (kinds[j-1] in ("sep", "jump") and
+                            l[j-1] != ")" or firstend[i] >= j):
+                            continue
+                        try:
+                            res = self._parse(text[offsets[i]:offsets[j]],
+                                              **kwargs)
+                            if res is None:
+                                continue
+                            ret = self._build(res, default, ignoretz,
+                                              tzinfos, tzcache)
+                        except (ValueError, OverflowError):
+                            continue
+                        found.append((offsets[i], offsets[j], ret))
+                        i = j-1
+                        break
+                i += 1
+        return found
+
+    # Characters of context taken around the digits found in the text.
+    _SEARCHGAP = 24
+
+    # Longest span, in tokens, tried as a date.
+    _SEARCHMAXTOKENS = 32
+
+    # Words that join two dates rather than the parts of one.
+    _SEARCHBREAKS = ("and",)
+
+    def _searchregions(self, text):
+        # The cheap pre-filter: every date has digits, so only the
+        # stretches of text around them are lexed. Runs of digits close
+        # enough to share some context are taken together.
+        gap = self._SEARCHGAP
+        regions = []
+        first = last = None
+        for m in _DIGITS_RE.finditer(text):
+            if last is not None and m.start()-last <= 2*gap:
+                last = m.end()
+                continue
+            if last is not None:
+                regions.append((first, last))
+            first, last = m.span()
+        if last is not None:
+            regions.append((first, last))
+        end = 0
+        for first, last in regions:
+            start = self._wordboundary(text, max(first-gap, end), first, -1)
+            end = self._wordboundary(text, min(last+gap, len(text)),
+                                     last, 1)
+            yield start, end
+
+    def _wordboundary(self, text, pos, limit, step):
+        # Moves pos out of the word it falls in, if that word is short
+        # enough to be a name. Otherwise the piece of it is dropped.
+        i = pos
+        if step < 0:
+            while i > 0 and pos-i < 16 and text[i-1].isalpha():
+                i -= 1
+            if i == 0 or not text[i-1].isalpha():
+                return i
+            while pos < limit and text[pos].isalpha():
+                pos += 1
+        else:
+            while i < len(text) and i-pos < 16 and text[i].isalpha():
+                i += 1
+            if i == len(text) or not text[i].isalpha():
+                return i
+            while pos > limit and text[pos-1].isalpha():
+                pos -= 1
+        return pos
+
+    def _searchkind(self, token):
+        # What a token may be in a date: "number", "month", "weekday",
+        # "ampm", "name" (other names and timezones), "jump" (words
+        # that may only be in the middle), "sep" (spaces and
+        # punctuation) or None, if it can't be part of a date at all.
+        if token[0] in "0123456789" and token[-1] in "0123456789":
+            return "number"
+        if len(token) == 1 and not token.isalnum():
+            if token in " ,.;:/-+'()":
+                return "sep"
+            return None
+        roles = self.info.classify(token)
+        if roles.weekday is not None:
+            return "weekday"
+        if roles.month is not None:
+            return "month"
+        if roles.ampm is not None:
+            return "ampm"
+        if (roles.hms is not None or roles.utczone or
+            (len(token) <= 5 and
+             not [x for x in token if x not in string.ascii_uppercase])):
+            return "name"
+        if ((roles.jump or roles.pertain) and
+            token.lower() not in self._SEARCHBREAKS):
+            return "jump"
+        return None
+
+    def _searchevidence(self, l, kinds):
+        # Finds the (first, last) token indexes of what only dates
+        # have: two numbers joined by a date or time separator, a month
+        # name next to a number, or a number followed by am/pm. Spans
+        # without any of these aren't even tried.
+        #
+        # Returns, for each token index i, the smallest last index of
+        # the evidence found at or after i, or len(l) if there's none,
+        # so that a span from i to j has some if that's below j.
+        evidence = []
+        for k in range(len(l)):
+            kind = kinds[k]
+            if kind == "month":
+                # Sep 25, 25th of Sep, Sep of 2003
+                for n in range(max(0, k-6), min(len(l), k+7)):
+                    if kinds[n] == "number":
+                        evidence.append((min(k, n), max(k, n)))
+            elif kind == "ampm":
+                if k > 0 and kinds[k-1] == "number":
+                    evidence.append((k-1, k))
+                elif (k > 1 and len(l[k]) > 1 and l[k-1] == " " and
+                      kinds[k-2] == "number"):
+                    # Not "10 a", which is likely just an article.
+                    evidence.append((k-2, k))
+            elif (0 < k < len(l)-1 and
+                  kinds[k-1] == kinds[k+1] == "number" and
+                  (l[k] in ":-/.Tt" or
+                   kind == "name" and self.info.hms(l[k]) is not None)):
+                evidence.append((k-1, k+1))
+        firstend = [len(l)]*(len(l)+1)
+        for lo, hi in evidence:
+            if hi < firstend[lo]:
+                firstend[lo] = hi
+        for k in range(len(l)-1, -1, -1):
+            if firstend[k+1] < firstend[k]:
+                firstend[k] = firstend[k+1]
+        return firstend
+
+    def _parsebuffer(self, buf, start, end, **kwargs):
+        # Like _parse(), for buf[start:end]. ISO-8601 timestamps are
+        # matched in place, without building any string; anything else
+        # is decoded and handed to _parse().
+        if not _MEMORYVIEWRE and type(buf) is _memoryview:
+            buf = buf[start:end].tobytes()
+            start, end = 0, len(buf)
+        if self._isofastpath:
+            m = _ISO8601_BRE.match(buf, start, end)
+            if m is not None:
+                groups = m.groups()
+                if groups[8] != b"," and groups[10] != b"z":
+                    res = self._isoresult(groups, groups[11] == b"-")
+                    if res is not None:
+                        return res
+        s = buf[start:end]
+        if type(s) is _memoryview:
+            s = s.tobytes()
+        return self._parse(s.decode(), **kwargs)
+
+    def _iterparse(self, items, select, default, ignoretz, tzinfos,
+                   errors, kwargs, build=None):
+        # Parses the strings in the (key, timestr) pairs of items,
+        # yielding (key, datetime) pairs. If given, select extracts
+        # the string to be parsed from timestr. Strings may also be
+        # bytes-like, or (buffer, start, end) tuples.
+        default = self._batchdefault(default, errors)
+        return self._iterparsegen(items, select, default, ignoretz,
+                                  tzinfos, errors, kwargs, build)
+
+    def _batchdefault(self, default, errors):
+        # Checks errors and resolves the default once for the whole
+        # batch.
+        if not (errors in ("raise", "coerce") or isinstance(errors, list)):
+            raise ValueError("errors must be 'raise', 'coerce' or a list")
         if not default:
             default = datetime.datetime.now().replace(hour=0, minute=0,
-                                                      second=0, microsecond=0)
+                                                      second=0,
+                                                      microsecond=0)
+        return default
+
+    def _iterparsegen(self, items, select, default, ignoretz, tzinfos,
+                      errors, kwargs, build=None):
+        _parse = self._parse
+        _build = build or self._build
+        tzcache = {}
+        for key, timestr in items:
+            try:
+                s = timestr
+                if select is not None:
+                    s = select(s)
+                if isinstance(s, text_type):
+                    res = _parse(s, **kwargs)
+                elif isinstance(s, tuple):
+                    # (buffer, start, end), from parse_buffer_many().
+                    res = self._parsebuffer(*s, **kwargs)
+                elif isinstance(s, _BUFFERTYPES):
+                    res = self._parsebuffer(s, 0, len(s), **kwargs)
+                else:
+                    raise ValueError("expected a string, got %r" % (s,))
+                if res is None:
+                    raise ValueError("unknown string format")
+                ret = _build(res, default, ignoretz, tzinfos, tzcache)
+            except (ValueError, OverflowError):
+                if errors == "raise":
+                    raise
+                if errors != "coerce":
+                    errors.append((key, timestr, sys.exc_info()[1]))
+                ret = None
+            yield key, ret
+
+    def parse_epoch(self, timestr, default=None,
+                          ignoretz=False, tzinfos=None,
+                          **kwargs):
         res = self._parse(timestr, **kwargs)
         if res is None:
             raise ValueError("unknown string format")
-        repl = {}
-        for attr in ["year", "month", "day", "hour",
-                     "minute", "second", "microsecond"]:
-            value = getattr(res, attr)
-            if value is not None:
-                repl[attr] = value
-        ret = default.replace(**repl)
+        return self._buildepoch(res, default, ignoretz, tzinfos)
+
+    def parse_many_epoch(self, timestrs, default=None,
+                               ignoretz=False, tzinfos=None,
+                               errors="coerce", missing=_NAT,
+                               asnumpy=False, workers=None, chunksize=1000,
+                               **kwargs):
+        out = array.array(_INT64)
+        append = out.append
+        if workers:
+            results = self._parallelparse(timestrs, default, ignoretz,
+                                          tzinfos, errors, kwargs,
+                                          workers, chunksize, "_buildepoch")
+        else:
+            results = self._iterparse(enumerate(timestrs), None, default,
+                                      ignoretz, tzinfos, errors, kwargs,
+                                      self._buildepoch)
+            results = (ret for i, ret in results)
+        for ret in results:
+            if ret is None:
+                append(missing)
+            else:
+                append(ret)
+        if asnumpy:
+            import numpy
+            return numpy.frombuffer(out, dtype=numpy.int64).view("M8[us]")
+        return out
+
+    def parse_fields(self, timestr, **kwargs):
+        if isinstance(timestr, _BUFFERTYPES):
+            res = self._parsebuffer(timestr, 0, len(timestr), **kwargs)
+        else:
+            res = self._parse(timestr, **kwargs)
+        if res is None:
+            raise ValueError("unknown string format")
+        return res
+
+    def parse_many_fields(self, timestrs, fields=None, errors="coerce",
+                                missing=_NOFIELD, **kwargs):
+        if fields is None:
+            fields = self._result.__slots__
+        for name in fields:
+            if name not in self._result.__slots__:
+                raise ValueError("unknown field %r" % (name,))
+        # The fields of all the rows go into one flat list, which is
+        # sliced into columns at the end.
+        fields = list(fields)
+        getter = operator.attrgetter(*fields)
+        rows = []
+        if len(fields) > 1:
+            add = rows.extend
+            unparsed = (None,)*len(fields)
+        else:
+            add = rows.append
+            unparsed = None
+        for i, res in self._iterparse(enumerate(timestrs), None, None,
+                                      False, None, errors, kwargs,
+                                      self._buildfields):
+            if res is None:
+                add(unparsed)
+            else:
+                add(getter(res))
+        columns = {}
+        for i, name in enumerate(fields):
+            column = rows[i::len(fields)]
+            if name != "tzname":
+                if None in column:
+                    column = [missing if value is None else value
+                              for value in column]
+                column = array.array("i", column)
+            columns[name] = column
+        return columns
+
+    def _buildfields(self, res, default, ignoretz, tzinfos, tzcache=None):
+        # The fields are kept as parsed.
+        return res
+
+    def _buildepoch(self, res, default, ignoretz, tzinfos, tzcache=None):
+        # Like _build(), but returns the microseconds since the epoch,
+        # in UTC, without building a datetime when the offset comes
+        # from the string. Naive results are taken as UTC.
+        if not default:
+            if res.year is None or res.month is None or res.day is None:
+                default = datetime.datetime.now().replace(hour=0, minute=0,
+                                                          second=0,
+                                                          microsecond=0)
+            else:
+                default = _MIDNIGHT
+        if (res.weekday is not None and not res.day or
+            type(default) is not datetime.datetime):
+            return _epoch(self._build(res, default, ignoretz,
+                                      tzinfos, tzcache))
+        year = res.year if res.year is not None else default.year
+        month = res.month if res.month is not None else default.month
+        day = res.day if res.day is not None else default.day
+        hour = res.hour if res.hour is not None else default.hour
+        minute = res.minute if res.minute is not None else default.minute
+        second = res.second if res.second is not None else default.second
+        microsecond = (res.microsecond if res.microsecond is not None
+                       else default.microsecond)
+        if not (0 <= hour < 24 and 0 <= minute < 60 and 0 <= second < 60
+                and 0 <= microsecond < 1000000):
+            raise ValueError("time out of range")
+        days = datetime.date(year, month, day).toordinal()-_EPOCHORDINAL
+        tzinfo = default.tzinfo
+        offset = 0
+        if not ignoretz:
+            if (tzinfos is None and res.tzoffset is not None and
+                not (res.tzname and res.tzname in time.tzname)):
+                # The offset _tzinfo() would find, without the object.
+                tzinfo = None
+                offset = res.tzoffset
+            else:
+                if tzcache is None:
+                    found = self._tzinfo(res, tzinfos)
+                else:
+                    key = (res.tzname, res.tzoffset)
+                    try:
+                        found = tzcache[key]
+                    except KeyError:
+                        found = tzcache[key] = self._tzinfo(res, tzinfos)
+                if found is not None:
+                    tzinfo = found
+        if tzinfo is not None:
+            delta = datetime.datetime(year, month, day, hour, minute,
+                                      second, microsecond,
+                                      tzinfo).utcoffset()
+            if delta:
+                offset = delta.days*86400+delta.seconds
+        return ((days*86400+hour*3600+minute*60+second-offset)*1000000+
+                microsecond)
+
+    def _parallelparse(self, timestrs, default, ignoretz, tzinfos,
+                       errors, kwargs, workers, chunksize, build=None):
+        # build is the name of the method turning results into return
+        # values, _build() by default.
+        # The default is resolved here, so that all the workers agree
+        # on it.
+        default = self._batchdefault(default, errors)
+        # The parser and the options are sent to each worker once, when
+        # it starts. Chunks carry only the strings.
+        import multiprocessing
+        pool = multiprocessing.Pool(workers, _parallelinit,
+                                    ((self.__class__, self._initargs(),
+                                      default, ignoretz, tzinfos,
+                                      kwargs, build),))
+        return self._parallelresults(pool, timestrs, errors, chunksize)
+
+    def _initargs(self):
+        # What a worker process passes to the class to get a parser
+        # like this one.
+        return (self.info,)
+
+    def _parallelresults(self, pool, timestrs, errors, chunksize):
+        if errors in ("raise", "coerce"):
+            mode = errors
+        else:
+            mode = "list"
+        items = enumerate(timestrs)
+        chunks = iter(lambda: (mode, list(itertools.islice(items,
+                                                           chunksize))),
+                      (mode, []))
+        try:
+            # imap() hands back the chunks in input order.
+            for results, chunkerrors in pool.imap(_parallelchunk, chunks):
+                if chunkerrors:
+                    errors.extend(chunkerrors)
+                for ret in results:
+                    yield ret
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _build(self, res, default, ignoretz, tzinfos, tzcache=None):
+        # Turns a _parse() result into a datetime, taking the missing
+        # fields from default. tzcache, if given, maps (tzname, tzoffset)
+        # to the tzinfo already resolved for it.
+        if not default:
+            if res.year is None or res.month is None or res.day is None:
+                default = datetime.datetime.now().replace(hour=0, minute=0,
+                                                          second=0,
+                                                          microsecond=0)
+            else:
+                # Only the (zeroed) time would be taken from the
+                # default, so don't bother asking for the current date.
+                default = _MIDNIGHT
+        if type(default) is datetime.datetime:
+            ret = datetime.datetime(
+                    res.year if res.year is not None else default.year,
+                    res.month if res.month is not None else default.month,
+                    res.day if res.day is not None else default.day,
+                    res.hour if res.hour is not None else default.hour,
+                    res.minute if res.minute is not None else default.minute,
+                    res.second if res.second is not None else default.second,
+                    res.microsecond if res.microsecond is not None
+                                    else default.microsecond,
+                    default.tzinfo)
+        else:
+            repl = {}
+            for attr in ["year", "month", "day", "hour",
+                         "minute", "second", "microsecond"]:
+                value = getattr(res, attr)
+                if value is not None:
+                    repl[attr] = value
+            ret = default.replace(**repl)
         if res.weekday is not None and not res.day:
             ret = ret+relativedelta.relativedelta(weekday=res.weekday)
         if not ignoretz:
-            if isinstance(tzinfos, collections.Callable) or tzinfos and res.tzname in tzinfos:
-                if isinstance(tzinfos, collections.Callable):
-                    tzdata = tzinfos(res.tzname, res.tzoffset)
-                else:
-                    tzdata = tzinfos.get(res.tzname)
-                if isinstance(tzdata, datetime.tzinfo):
-                    tzinfo = tzdata
-                elif isinstance(tzdata, text_type):
-                    tzinfo = tz.tzstr(tzdata)
-                elif isinstance(tzdata, integer_types):
-                    tzinfo = tz.tzoffset(res.tzname, tzdata)
-                else:
-                    raise ValueError("offset must be tzinfo subclass, " \
-                                      "tz string, or int offset")
+            if tzcache is None:
+                tzinfo = self._tzinfo(res, tzinfos)
+            else:
+                key = (res.tzname, res.tzoffset)
+                try:
+                    tzinfo = tzcache[key]
+                except KeyError:
+                    tzinfo = tzcache[key] = self._tzinfo(res, tzinfos)
+            if tzinfo is not None:
                 ret = ret.replace(tzinfo=tzinfo)
-            elif res.tzname and res.tzname in time.tzname:
-                ret = ret.replace(tzinfo=tz.tzlocal())
-            elif res.tzoffset == 0:
-                ret = ret.replace(tzinfo=tz.tzutc())
-            elif res.tzoffset:
-                ret = ret.replace(tzinfo=tz.tzoffset(res.tzname, res.tzoffset))
         return ret
 
+    def _tzinfo(self, res, tzinfos):
+        cache = self.tzcache
+        if cache is None:
+            return self._resolvetz(res, tzinfos)
+        key = (tzinfos, res.tzname, res.tzoffset)
+        try:
+            with self._cachelock:
+                tzinfo = cache.get(key, _NOTFOUND)
+        except TypeError:
+            # A dict of tzinfos can't be part of the key.
+            return self._resolvetz(res, tzinfos)
+        if tzinfo is _NOTFOUND:
+            tzinfo = self._resolvetz(res, tzinfos)
+            with self._cachelock:
+                cache[key] = tzinfo
+        return tzinfo
+
+    def _resolvetz(self, res, tzinfos):
+        if callable(tzinfos) or tzinfos and res.tzname in tzinfos:
+            if callable(tzinfos):
+                tzdata = tzinfos(res.tzname, res.tzoffset)
+            else:
+                tzdata = tzinfos.get(res.tzname)
+            if isinstance(tzdata, datetime.tzinfo):
+                return tzdata
+            elif isinstance(tzdata, text_type):
+                return tz.tzstr(tzdata)
+            elif isinstance(tzdata, integer_types):
+                return tz.tzoffset(res.tzname, tzdata)
+            else:
+                raise ValueError("offset must be tzinfo subclass, " \
+                                  "tz string, or int offset")
+        elif res.tzname and res.tzname in time.tzname:
+            return tz.tzlocal()
+        elif res.tzoffset == 0:
+            return tz.tzutc()
+        elif res.tzoffset:
+            return tz.tzoffset(res.tzname, res.tzoffset)
+        return None
+
     class _result(_resultbase):
         __slots__ = ["year", "month", "day", "weekday",
                      "hour", "minute", "second", "microsecond",
                      "tzname", "tzoffset"]
 
-    def _parse(self, timestr, dayfirst=None, yearfirst=None, fuzzy=False):
+    def _parse(self, timestr, dayfirst=None, yearfirst=None, fuzzy=False,
+                     epoch=None):
+        trace = None
+        stats = self.stats
+        if stats is not None:
+            trace = stats._trace
+            if trace is None:
+                return stats._measure(self._parse, timestr, dayfirst,
+                                      yearfirst, fuzzy, epoch)
+        info = self.info
+        if epoch and isinstance(timestr, (text_type, binary_type)):
+            res = self._parseepoch(timestr, epoch)
+            if res is not None:
+                if trace is not None:
+                    trace.path = "epoch"
+                return res
+        if self._isofastpath and isinstance(timestr, text_type):
+            res = self._parseiso(timestr)
+            if res is not None:
+                if trace is not None:
+                    trace.path = "iso"
+                return res
+        l = self._lexer.split(timestr)
+        if self._localeparsers is not None:
+            # Lexed once, and parsed with the words of its locale, and
+            # its order unless the multiparserinfo sets one.
+            if dayfirst is None:
+                dayfirst = info.dayfirst
+            if yearfirst is None:
+                yearfirst = info.yearfirst
+            p = self._localeparsers[info._localeindex(l)]
+            return p._parsetokens(l, dayfirst, yearfirst, fuzzy, trace)
+        return self._parsetokens(l, dayfirst, yearfirst, fuzzy, trace)
+
+    def _parsetokens(self, l, dayfirst, yearfirst, fuzzy, trace=None):
         info = self.info
         if dayfirst is None:
             dayfirst = info.dayfirst
         if yearfirst is None:
             yearfirst = info.yearfirst
-        res = self._result()
-        l = _timelex.split(timestr)
+        shape = (fuzzy, self._shape(l))
         try:
 
-            # year/month/day list
-            ymd = []
+            compiled = self._compiled.get(shape)
+            if compiled is not None:
+                # Same layout as a previously parsed string, so replay
+                # the recorded operations instead of scanning again.
+                ops, mstridx = compiled
+                if trace is not None:
+                    trace.path = "replay"
+                    trace.tokens = len(l)
+                    trace.ops = ops
+                res = self._result()
+                ymd = []
+                for op, args in ops:
+                    op(info, res, ymd, l, *args)
+            else:
+                ops = []
+                if trace is not None:
+                    trace.path = "scan"
+                    trace.tokens = len(l)
+                    trace.ops = ops
+                scanned = self._scan(l, fuzzy, ops)
+                if scanned is None:
+                    return None
+                res, ymd, mstridx = scanned
+                if len(self._compiled) >= self._SHAPECACHESIZE:
+                    self._compiled.clear()
+                self._compiled[shape] = (ops, mstridx)
 
-            # Index of the month string in ymd
-            mstridx = -1
+            if not self._resolveymd(res, ymd, mstridx, dayfirst, yearfirst):
+                return None
 
-            len_l = len(l)
-            i = 0
-            while i < len_l:
+        except (IndexError, ValueError, AssertionError) as e:
+            if trace is not None:
+                trace.error = e.__class__.__name__
+            return None
+
+        if not info.validate(res):
+            return None
+        return res
 
-                # Check if it's a number
+    # Microseconds in each unit of epoch=, and the unit taken for
+    # epoch=True by the number of digits: 2001-2286 (or 1973-2001 for
+    # seconds) at each precision. Other numbers, like YYYYMMDD, are
+    # left to the token cascade.
+    _EPOCHUNITS = {"s": 10**6, "ms": 10**3, "us": 1}
+    _EPOCHDIGITS = {9: "s", 10: "s", 13: "ms", 16: "us"}
+
+    def _parseepoch(self, timestr, unit):
+        # Decodes a Unix timestamp into a UTC result, or returns None
+        # if timestr isn't one.
+        if unit is not True and unit not in self._EPOCHUNITS:
+            raise ValueError("epoch must be True, 's', 'ms' or 'us'")
+        if isinstance(timestr, binary_type):
+            m = _EPOCH_BRE.match(timestr)
+        else:
+            m = _EPOCH_RE.match(timestr)
+        if m is None:
+            return None
+        sign, digits, fraction = m.groups()
+        if unit is True:
+            unit = self._EPOCHDIGITS.get(len(digits))
+            if unit is None:
+                return None
+        scale = self._EPOCHUNITS[unit]
+        us = int(digits)*scale
+        if fraction:
+            us += int(fraction)*scale//10**len(fraction)
+        if sign:
+            us = -us
+        days, us = divmod(us, 86400000000)
+        try:
+            date = datetime.date.fromordinal(_EPOCHORDINAL+days)
+        except (ValueError, OverflowError):
+            return None
+        res = self._result()
+        res.year, res.month, res.day = date.year, date.month, date.day
+        res.hour, us = divmod(us, 3600000000)
+        res.minute, us = divmod(us, 60000000)
+        res.second, res.microsecond = divmod(us, 1000000)
+        res.tzoffset = 0
+        return res
+
+    def _resolveymd(self, res, ymd, mstridx, dayfirst, yearfirst):
+        # Assigns the year, month and day collected in ymd to res.
+        # Returns False if they make no sense.
+        len_ymd = len(ymd)
+        if len_ymd > 3:
+            # More than three members!?
+            return False
+        elif len_ymd == 1 or (mstridx != -1 and len_ymd == 2):
+            # One member, or two members with a month string
+            if mstridx != -1:
+                res.month = ymd[mstridx]
+                del ymd[mstridx]
+            if len_ymd > 1 or mstridx == -1:
+                if ymd[0] > 31:
+                    res.year = ymd[0]
+                else:
+                    res.day = ymd[0]
+        elif len_ymd == 2:
+            # Two members with numbers
+            if ymd[0] > 31:
+                # 99-01
+                res.year, res.month = ymd
+            elif ymd[1] > 31:
+                # 01-99
+                res.month, res.year = ymd
+            elif dayfirst and ymd[1] <= 12:
+                # 13-01
+                res.day, res.month = ymd
+            else:
+                # 01-13
+                res.month, res.day = ymd
+        if len_ymd == 3:
+            # Three members
+            if mstridx == 0:
+                res.month, res.day, res.year = ymd
+            elif mstridx == 1:
+                if ymd[0] > 31 or (yearfirst and ymd[2] <= 31):
+                    # 99-Jan-01
+                    res.year, res.month, res.day = ymd
+                else:
+                    # 01-Jan-01
+                    # Give precendence to day-first, since
+                    # two-digit years is usually hand-written.
+                    res.day, res.month, res.year = ymd
+            elif mstridx == 2:
+                # WTF!?
+                if ymd[1] > 31:
+                    # 01-99-Jan
+                    res.day, res.year, res.month = ymd
+                else:
+                    # 99-01-Jan
+                    res.year, res.day, res.month = ymd
+            else:
+                if ymd[0] > 31 or \
+                   (yearfirst and ymd[1] <= 12 and ymd[2] <= 31):
+                    # 99-01-01
+                    res.year, res.month, res.day = ymd
+                elif ymd[0] > 12 or (dayfirst and ymd[1] <= 12):
+                    # 13-01-01
+                    res.day, res.month, res.year = ymd
+                else:
+                    # 01-13-01
+                    res.month, res.day, res.year = ymd
+        return True
+
+    def _isocompatible(self):
+        # _parseiso() assumes the ISO designators and separators are
+        # read by the token cascade the way the default parserinfo
+        # reads them.
+        info = self.info
+        for token in ("T", "t", " ", "Z", "-", "+", ":", "."):
+            if (info.hms(token) is not None or
+                info.ampm(token) is not None or
+                info.weekday(token) is not None or
+                info.month(token) is not None):
+                return False
+        return bool(info.jump("T") and info.jump("t") and info.jump(" "))
+
+    def _parseiso(self, timestr):
+        # Decodes strict ISO-8601 strings straight into a result, with
+        # the same fields the token cascade would produce for them.
+        # Anything it isn't sure about is left to the cascade.
+        m = _ISO8601_RE.match(timestr)
+        if m is None:
+            return None
+        groups = m.groups()
+        if groups[8] == ',' or groups[10] == 'z':
+            return None
+        return self._isoresult(groups, groups[11] == '-')
+
+    def _isodatetime(self, timestr, ignoretz):
+        # What _build() returns for _parseiso(timestr), with no default
+        # or tzinfos and the default parserinfo, without building the
+        # result in between. None if timestr is left to _parse().
+        m = _ISO8601_RE.match(timestr)
+        if m is None:
+            return None
+        (year, datesep, month, day, hour, timesep, minute, second,
+         fracsep, fraction, utc, sign, tzhour, tzminute) = m.groups()
+        year = int(year)
+        # Two digit years go through convertyear().
+        if year < 100 or fracsep == ',' or utc == 'z':
+            return None
+        microsecond = 0
+        if fraction:
+            fraction = fraction[:6]
+            microsecond = int(fraction)*10**(6-len(fraction))
+        tzinfo = None
+        if not ignoretz and (utc or sign):
+            if sign:
+                tzinfo = _isooffset(sign, tzhour, tzminute)
+            if tzinfo is None:
+                if "UTC" in time.tzname:
+                    tzinfo = tz.tzlocal()
+                else:
+                    tzinfo = tz.tzutc()
+        digits = _ISODIGITS
+        return datetime.datetime(year, digits[month], digits[day],
+                                 digits[hour], digits[minute],
+                                 digits[second], microsecond, tzinfo)
+
+    def _isoresult(self, groups, negative):
+        # groups are those of _ISO8601_RE, or of _ISO8601_BRE for bytes.
+        (year, datesep, month, day, hour, timesep, minute, second,
+         fracsep, fraction, utc, sign, tzhour, tzminute) = groups
+        year = int(year)
+        if year <= 31:
+            return None
+        info = self.info
+        res = self._result()
+        res.year = year
+        res.month = int(month)
+        res.day = int(day)
+        if hour is not None:
+            res.hour = int(hour)
+            if minute is not None:
+                res.minute = int(minute)
+                if second is not None:
+                    res.second = int(second)
+                    if fraction:
+                        fraction = fraction[:6]
+                        res.microsecond = (int(fraction)*
+                                           10**(6-len(fraction)))
+                    else:
+                        res.microsecond = 0
+        if utc:
+            # Lowercase "z" was left to the cascade.
+            res.tzname = "Z"
+            res.tzoffset = info.tzoffset("Z")
+        elif sign:
+            res.tzoffset = int(tzhour)*3600+int(tzminute or 0)*60
+            if negative:
+                res.tzoffset *= -1
+        if not info.validate(res):
+            return None
+        return res
+
+    def _shape(self, l):
+        # The shape of a token list is everything the scanning cascade
+        # in _scan() looks at to decide which branch to take: numbers
+        # are reduced to their length and dot position, and month or
+        # weekday names to their kind. Any other token is kept as is.
+        codes = self._shapecodes
+        shape = []
+        for token in l:
+            if token[0] in "0123456789" and token[-1] in "0123456789":
+                shape.append((len(token), token.find('.')))
+            else:
                 try:
-                    value_repr = l[i]
-                    value = float(value_repr)
-                except ValueError:
-                    value = None
+                    shape.append(codes[token])
+                except KeyError:
+                    if len(codes) >= self._SHAPECACHESIZE:
+                        codes.clear()
+                    code = codes[token] = self._shapecode(token)
+                    shape.append(code)
+        return tuple(shape)
+
+    def _shapecode(self, token):
+        info = self.info
+        roles = info.classify(token)
+        if (roles.jump or roles.pertain or roles.utczone or
+            roles.hms is not None or roles.ampm is not None or
+            (len(token) <= 5 and
+             not [x for x in token if x not in string.ascii_uppercase])):
+            return token
+        try:
+            float(token)
+        except ValueError:
+            pass
+        else:
+            return token
+        isweekday = roles.weekday is not None
+        ismonth = roles.month is not None
+        if isweekday and not ismonth:
+            return self._WEEKDAYSHAPE
+        elif ismonth and not isweekday:
+            return self._MONTHSHAPE
+        return token
 
-                if value is not None:
-                    # Token is a number
-                    len_li = len(l[i])
-                    i += 1
-                    if (len(ymd) == 3 and len_li in (2, 4)
-                        and (i >= len_l or (l[i] != ':' and
-                                            info.hms(l[i]) is None))):
-                        # 19990101T23[59]
-                        s = l[i-1]
-                        res.hour = int(s[:2])
-                        if len_li == 4:
-                            res.minute = int(s[2:])
-                    elif len_li == 6 or (len_li > 6 and l[i-1].find('.') == 6):
-                        # YYMMDD or HHMMSS[.ss]
-                        s = l[i-1] 
-                        if not ymd and l[i-1].find('.') == -1:
-                            ymd.append(info.convertyear(int(s[:2])))
-                            ymd.append(int(s[2:4]))
-                            ymd.append(int(s[4:]))
+    def _scan(self, l, fuzzy, ops):
+        # Runs the token cascade over l. Every assignment to the result
+        # is done through one of the _op_* functions, and recorded in
+        # ops so that _parse() can replay it on strings of the same shape.
+        info = self.info
+        res = self._result()
+
+        # year/month/day list
+        ymd = []
+
+        # Index of the month string in ymd
+        mstridx = -1
+
+        def apply(op, *args):
+            op(info, res, ymd, l, *args)
+            ops.append((op, args))
+
+        # What each token may stand for, looked up once.
+        roles = info.classifyall(l)
+
+        len_l = len(l)
+        i = 0
+        while i < len_l:
+
+            # Check if it's a number
+            try:
+                value = float(l[i])
+            except ValueError:
+                value = None
+
+            if value is not None:
+                # Token is a number
+                len_li = len(l[i])
+                i += 1
+                if (len(ymd) == 3 and len_li in (2, 4)
+                    and (i >= len_l or (l[i] != ':' and
+                                        roles[i].hms is None))):
+                    # 19990101T23[59]
+                    apply(_op_hhmm, i-1)
+                elif len_li == 6 or (len_li > 6 and l[i-1].find('.') == 6):
+                    # YYMMDD or HHMMSS[.ss]
+                    if not ymd and l[i-1].find('.') == -1:
+                        apply(_op_yymmdd, i-1)
+                    else:
+                        # 19990101T235959[.59]
+                        apply(_op_hhmmss, i-1)
+                elif len_li == 8:
+                    # YYYYMMDD
+                    apply(_op_yyyymmdd, i-1)
+                elif len_li in (12, 14):
+                    # YYYYMMDDhhmm[ss]
+                    apply(_op_yyyymmddhhmm, i-1)
+                elif ((i < len_l and roles[i].hms is not None) or
+                      (i+1 < len_l and l[i] == ' ' and
+                       roles[i+1].hms is not None)):
+                    # HH[ ]h or MM[ ]m or SS[.ss][ ]s
+                    valueidx = i-1
+                    if l[i] == ' ':
+                        i += 1
+                    idx = roles[i].hms
+                    while True:
+                        if idx == 0:
+                            apply(_op_hour, valueidx)
+                        elif idx == 1:
+                            apply(_op_minute, valueidx)
+                        elif idx == 2:
+                            apply(_op_second, valueidx)
+                        i += 1
+                        if i >= len_l or idx == 2:
+                            break
+                        # 12h00
+                        try:
+                            float(l[i])
+                        except ValueError:
+                            break
                         else:
-                            # 19990101T235959[.59]
-                            res.hour = int(s[:2])
-                            res.minute = int(s[2:4])
-                            res.second, res.microsecond = _parsems(s[4:])
-                    elif len_li == 8:
-                        # YYYYMMDD
-                        s = l[i-1]
-                        ymd.append(int(s[:4]))
-                        ymd.append(int(s[4:6]))
-                        ymd.append(int(s[6:]))
-                    elif len_li in (12, 14):
-                        # YYYYMMDDhhmm[ss]
-                        s = l[i-1]
-                        ymd.append(int(s[:4]))
-                        ymd.append(int(s[4:6]))
-                        ymd.append(int(s[6:8]))
-                        res.hour = int(s[8:10])
-                        res.minute = int(s[10:12])
-                        if len_li == 14:
-                            res.second = int(s[12:])
-                    elif ((i < len_l and info.hms(l[i]) is not None) or
-                          (i+1 < len_l and l[i] == ' ' and
-                           info.hms(l[i+1]) is not None)):
-                        # HH[ ]h or MM[ ]m or SS[.ss][ ]s
-                        if l[i] == ' ':
-                            i += 1
-                        idx = info.hms(l[i])
-                        while True:
-                            if idx == 0:
-                                res.hour = int(value)
-                                if value%1:
-                                    res.minute = int(60*(value%1))
-                            elif idx == 1:
-                                res.minute = int(value)
-                                if value%1:
-                                    res.second = int(60*(value%1))
-                            elif idx == 2:
-                                res.second, res.microsecond = \
-                                    _parsems(value_repr)
+                            valueidx = i
                             i += 1
-                            if i >= len_l or idx == 2:
-                                break
-                            # 12h00
-                            try:
-                                value_repr = l[i]
-                                value = float(value_repr)
-                            except ValueError:
-                                break
+                            idx += 1
+                            if i < len_l:
+                                newidx = roles[i].hms
+                                if newidx is not None:
+                                    idx = newidx
+                elif i == len_l and l[i-2] == ' ' and roles[i-3].hms is not None:
+                    # X h MM or X m SS
+                    idx = roles[i-3].hms + 1
+                    if idx == 1:
+                        apply(_op_minute, i-1)
+                elif i+1 < len_l and l[i] == ':':
+                    # HH:MM[:SS[.ss]]
+                    apply(_op_hour, i-1)
+                    i += 1
+                    apply(_op_minute, i)
+                    i += 1
+                    if i < len_l and l[i] == ':':
+                        apply(_op_second, i+1)
+                        i += 2
+                elif i < len_l and l[i] in ('-', '/', '.'):
+                    sep = l[i]
+                    apply(_op_ymdvalue, i-1)
+                    i += 1
+                    if i < len_l and not roles[i].jump:
+                        try:
+                            # 01-01[-01]
+                            apply(_op_ymdint, i)
+                        except ValueError:
+                            # 01-Jan[-01]
+                            if roles[i].month is not None:
+                                apply(_op_ymdmonth, i)
+                                assert mstridx == -1
+                                mstridx = len(ymd)-1
                             else:
-                                i += 1
-                                idx += 1
-                                if i < len_l:
-                                    newidx = info.hms(l[i])
-                                    if newidx is not None:
-                                        idx = newidx
-                    elif i == len_l and l[i-2] == ' ' and info.hms(l[i-3]) is not None:
-                        # X h MM or X m SS
-                        idx = info.hms(l[i-3]) + 1
-                        if idx == 1:
-                            res.minute = int(value)
-                            if value%1:
-                                res.second = int(60*(value%1))
-                            elif idx == 2:
-                                res.second, res.microsecond = \
-                                        _parsems(value_repr)
-                                i += 1
-                    elif i+1 < len_l and l[i] == ':':
-                        # HH:MM[:SS[.ss]]
-                        res.hour = int(value)
-                        i += 1
-                        value = float(l[i])
-                        res.minute = int(value)
-                        if value%1:
-                            res.second = int(60*(value%1))
-                        i += 1
-                        if i < len_l and l[i] == ':':
-                            res.second, res.microsecond = _parsems(l[i+1])
-                            i += 2
-                    elif i < len_l and l[i] in ('-', '/', '.'):
-                        sep = l[i]
-                        ymd.append(int(value))
+                                return None
                         i += 1
-                        if i < len_l and not info.jump(l[i]):
-                            try:
-                                # 01-01[-01]
-                                ymd.append(int(l[i]))
-                            except ValueError:
-                                # 01-Jan[-01]
-                                value = info.month(l[i])
-                                if value is not None:
-                                    ymd.append(value)
-                                    assert mstridx == -1
-                                    mstridx = len(ymd)-1
-                                else:
-                                    return None
+                        if i < len_l and l[i] == sep:
+                            # We have three members
                             i += 1
-                            if i < len_l and l[i] == sep:
-                                # We have three members
-                                i += 1
-                                value = info.month(l[i])
-                                if value is not None:
-                                    ymd.append(value)
-                                    mstridx = len(ymd)-1
-                                    assert mstridx == -1
-                                else:
-                                    ymd.append(int(l[i]))
-                                i += 1
-                    elif i >= len_l or info.jump(l[i]):
-                        if i+1 < len_l and info.ampm(l[i+1]) is not None:
-                            # 12 am
-                            res.hour = int(value)
-                            if res.hour < 12 and info.ampm(l[i+1]) == 1:
-                                res.hour += 12
-                            elif res.hour == 12 and info.ampm(l[i+1]) == 0:
-                                res.hour = 0
+                            if roles[i].month is not None:
+                                apply(_op_ymdmonth, i)
+                                mstridx = len(ymd)-1
+                                assert mstridx == -1
+                            else:
+                                apply(_op_ymdint, i)
                             i += 1
-                        else:
-                            # Year, month or day
-                            ymd.append(int(value))
-                        i += 1
-                    elif info.ampm(l[i]) is not None:
-                        # 12am
-                        res.hour = int(value)
-                        if res.hour < 12 and info.ampm(l[i]) == 1:
-                            res.hour += 12
-                        elif res.hour == 12 and info.ampm(l[i]) == 0:
-                            res.hour = 0
+                elif i >= len_l or roles[i].jump:
+                    if i+1 < len_l and roles[i+1].ampm is not None:
+                        # 12 am
+                        apply(_op_hourampm, i-1, i+1)
                         i += 1
-                    elif not fuzzy:
-                        return None
                     else:
-                        i += 1
-                    continue
-
-                # Check weekday
-                value = info.weekday(l[i])
-                if value is not None:
-                    res.weekday = value
+                        # Year, month or day
+                        apply(_op_ymdvalue, i-1)
                     i += 1
-                    continue
-
-                # Check month name
-                value = info.month(l[i])
-                if value is not None:
-                    ymd.append(value)
-                    assert mstridx == -1
-                    mstridx = len(ymd)-1
+                elif roles[i].ampm is not None:
+                    # 12am
+                    apply(_op_hourampm, i-1, i)
                     i += 1
-                    if i < len_l:
-                        if l[i] in ('-', '/'):
-                            # Jan-01[-99]
-                            sep = l[i]
+                elif not fuzzy:
+                    return None
+                else:
+                    apply(_op_skip, i-1)
+                    i += 1
+                continue
+
+            # Check weekday
+            if roles[i].weekday is not None:
+                apply(_op_weekday, i)
+                i += 1
+                continue
+
+            # Check month name
+            if roles[i].month is not None:
+                apply(_op_ymdmonth, i)
+                assert mstridx == -1
+                mstridx = len(ymd)-1
+                i += 1
+                if i < len_l:
+                    if l[i] in ('-', '/'):
+                        # Jan-01[-99]
+                        sep = l[i]
+                        i += 1
+                        apply(_op_ymdint, i)
+                        i += 1
+                        if i < len_l and l[i] == sep:
+                            # Jan-01-99
                             i += 1
-                            ymd.append(int(l[i]))
+                            apply(_op_ymdint, i)
                             i += 1
-                            if i < len_l and l[i] == sep:
-                                # Jan-01-99
-                                i += 1
-                                ymd.append(int(l[i]))
-                                i += 1
-                        elif (i+3 < len_l and l[i] == l[i+2] == ' '
-                              and info.pertain(l[i+1])):
-                            # Jan of 01
-                            # In this case, 01 is clearly year
-                            try:
-                                value = int(l[i+3])
-                            except ValueError:
-                                # Wrong guess
-                                pass
-                            else:
-                                # Convert it here to become unambiguous
-                                ymd.append(info.convertyear(value))
-                            i += 4
-                    continue
+                    elif (i+3 < len_l and l[i] == l[i+2] == ' '
+                          and roles[i+1].pertain):
+                        # Jan of 01
+                        # In this case, 01 is clearly year
+                        try:
+                            # Convert it here to become unambiguous
+                            apply(_op_ymdyear, i+3)
+                        except ValueError:
+                            # Wrong guess
+                            pass
+                        i += 4
+                continue
 
-                # Check am/pm
-                value = info.ampm(l[i])
-                if value is not None:
-                    if value == 1 and res.hour < 12:
-                        res.hour += 12
-                    elif value == 0 and res.hour == 12:
-                        res.hour = 0
-                    i += 1
-                    continue
+            # Check am/pm
+            if roles[i].ampm is not None:
+                if res.hour is None:
+                    # No hour for it to apply to, as in "3/4 pm".
+                    if not fuzzy:
+                        return None
+                    apply(_op_skip, i)
+                else:
+                    apply(_op_ampm, i)
+                i += 1
+                continue
 
-                # Check for a timezone name
-                if (res.hour is not None and len(l[i]) <= 5 and
-                    res.tzname is None and res.tzoffset is None and
-                    not [x for x in l[i] if x not in string.ascii_uppercase]):
-                    res.tzname = l[i]
-                    res.tzoffset = info.tzoffset(res.tzname)
-                    i += 1
+            # Check for a timezone name
+            if (res.hour is not None and len(l[i]) <= 5 and
+                res.tzname is None and res.tzoffset is None and
+                not [x for x in l[i] if x not in string.ascii_uppercase]):
+                apply(_op_tzname, i)
+                i += 1
 
-                    # Check for something like GMT+3, or BRST+3. Notice
-                    # that it doesn't mean "I am 3 hours after GMT", but
-                    # "my time +3 is GMT". If found, we reverse the
-                    # logic so that timezone parsing code will get it
-                    # right.
-                    if i < len_l and l[i] in ('+', '-'):
-                        l[i] = ('+', '-')[l[i] == '+']
-                        res.tzoffset = None
-                        if info.utczone(res.tzname):
-                            # With something like GMT+3, the timezone
-                            # is *not* GMT.
-                            res.tzname = None
+                # Check for something like GMT+3, or BRST+3. Notice
+                # that it doesn't mean "I am 3 hours after GMT", but
+                # "my time +3 is GMT". If found, we reverse the
+                # logic so that timezone parsing code will get it
+                # right.
+                if i < len_l and l[i] in ('+', '-'):
+                    apply(_op_tzreverse, i)
+                    roles[i] = info.classify(l[i])
 
-                    continue
+                continue
 
-                # Check for a numbered timezone
-                if res.hour is not None and l[i] in ('+', '-'):
-                    signal = (-1, 1)[l[i] == '+']
-                    i += 1
-                    len_li = len(l[i])
-                    if len_li == 4:
-                        # -0300
-                        res.tzoffset = int(l[i][:2])*3600+int(l[i][2:])*60
-                    elif i+1 < len_l and l[i+1] == ':':
-                        # -03:00
-                        res.tzoffset = int(l[i])*3600+int(l[i+2])*60
-                        i += 2
-                    elif len_li <= 2:
-                        # -[0]3
-                        res.tzoffset = int(l[i][:2])*3600
-                    else:
-                        return None
-                    i += 1
-                    res.tzoffset *= signal
-
-                    # Look for a timezone name between parenthesis
-                    if (i+3 < len_l and
-                        info.jump(l[i]) and l[i+1] == '(' and l[i+3] == ')' and
-                        3 <= len(l[i+2]) <= 5 and
-                        not [x for x in l[i+2]
-                                if x not in string.ascii_uppercase]):
-                        # -0300 (BRST)
-                        res.tzname = l[i+2]
-                        i += 4
-                    continue
-
-                # Check jumps
-                if not (info.jump(l[i]) or fuzzy):
+            # Check for a numbered timezone
+            if res.hour is not None and l[i] in ('+', '-'):
+                signidx = i
+                i += 1
+                len_li = len(l[i])
+                if len_li == 4:
+                    # -0300
+                    apply(_op_tzhhmm, signidx)
+                elif i+1 < len_l and l[i+1] == ':':
+                    # -03:00
+                    apply(_op_tzhh_mm, signidx)
+                    i += 2
+                elif len_li <= 2:
+                    # -[0]3
+                    apply(_op_tzhh, signidx)
+                else:
                     return None
-
                 i += 1
 
-            # Process year/month/day
-            len_ymd = len(ymd)
-            if len_ymd > 3:
-                # More than three members!?
+                # Look for a timezone name between parenthesis
+                if (i+3 < len_l and
+                    roles[i].jump and l[i+1] == '(' and l[i+3] == ')' and
+                    3 <= len(l[i+2]) <= 5 and
+                    not [x for x in l[i+2]
+                            if x not in string.ascii_uppercase]):
+                    # -0300 (BRST)
+                    apply(_op_tzabbr, i+2)
+                    i += 4
+                continue
+
+            # Check jumps
+            if not roles[i].jump:
+                if not fuzzy:
+                    return None
+                apply(_op_skip, i)
+
+            i += 1
+
+        return res, ymd, mstridx
+
+
+class streamparser(parser):
+    """Parser for sequences of similar strings, like the timestamps of
+    a log file.
+
+    It remembers the tokens of the last string parsed. When the next
+    one differs only in its digits, it isn't lexed again: the numeric
+    tokens are just sliced out of it at the same positions. Then only
+    the recorded operations reading tokens that changed are replayed,
+    starting from a snapshot of the fields taken on the last string.
+    """
+
+    # Strings with the same digit pattern lex to tokens in the same
+    # positions.
+    _DIGITPATTERN = dict((ord(c), "0") for c in "123456789")
+
+    # How far past its index argument each operation reads. Operations
+    # after _op_tzreverse, which changes the token list, can't be
+    # skipped.
+    _OPREACH = {_op_tzhhmm: 1, _op_tzhh_mm: 3, _op_tzhh: 1,
+                _op_tzreverse: sys.maxsize}
+
+    def __init__(self, info=None, cachesize=0, tzcachesize=0, stats=None):
+        parser.__init__(self, info, cachesize, tzcachesize, stats)
+        self._reaches = {}
+        self.reset()
+
+    def reset(self):
+        """Forget the last string parsed."""
+        self._lastpattern = None
+        self._lasttokens = []
+        self._lastshape = None
+        # (index, start, end) of the tokens with digits.
+        self._numspans = []
+        # (shape, number of operations applied, [(attr, value)], ymd)
+        self._snapshot = None
+
+    def _parse(self, timestr, dayfirst=None, yearfirst=None, fuzzy=False,
+                     epoch=None):
+        if (self._lexer is not _retimelex or
+            self._localeparsers is not None or
+            not isinstance(timestr, text_type) or "\x00" in timestr):
+            return parser._parse(self, timestr, dayfirst, yearfirst, fuzzy,
+                                 epoch)
+        trace = None
+        stats = self.stats
+        if stats is not None:
+            trace = stats._trace
+            if trace is None:
+                return stats._measure(self._parse, timestr, dayfirst,
+                                      yearfirst, fuzzy, epoch)
+        info = self.info
+        if epoch:
+            res = self._parseepoch(timestr, epoch)
+            if res is not None:
+                if trace is not None:
+                    trace.path = "epoch"
+                return res
+        if self._isofastpath:
+            res = self._parseiso(timestr)
+            if res is not None:
+                if trace is not None:
+                    trace.path = "iso"
+                return res
+        if dayfirst is None:
+            dayfirst = info.dayfirst
+        if yearfirst is None:
+            yearfirst = info.yearfirst
+
+        pattern = timestr.translate(self._DIGITPATTERN)
+        if pattern == self._lastpattern:
+            tokens, codes, changed = self._retoken(timestr)
+        else:
+            tokens = _retimelex.split(timestr)
+            codes = self._shape(tokens)
+            changed = 0
+            self._lastpattern = pattern
+            self._numspans = self._findnumspans(tokens)
+        shape = (fuzzy, codes)
+        if shape != self._lastshape:
+            changed = 0
+        self._lasttokens = tokens
+        self._lastshape = shape
+
+        l = tokens[:]
+        try:
+            compiled = self._compiled.get(shape)
+            if compiled is None:
+                self._snapshot = None
+                ops = []
+                if trace is not None:
+                    trace.path = "scan"
+                    trace.tokens = len(l)
+                    trace.ops = ops
+                scanned = self._scan(l, fuzzy, ops)
+                if scanned is None:
+                    return None
+                res, ymd, mstridx = scanned
+                if len(self._compiled) >= self._SHAPECACHESIZE:
+                    self._compiled.clear()
+                self._compiled[shape] = (ops, mstridx)
+            else:
+                ops, mstridx = compiled
+                if trace is not None:
+                    trace.path = "stream"
+                    trace.tokens = len(l)
+                    trace.ops = ops
+                res, ymd = self._replay(ops, l, shape, changed)
+            if not self._resolveymd(res, ymd, mstridx, dayfirst, yearfirst):
                 return None
-            elif len_ymd == 1 or (mstridx != -1 and len_ymd == 2):
-                # One member, or two members with a month string
-                if mstridx != -1:
-                    res.month = ymd[mstridx]
-                    del ymd[mstridx]
-                if len_ymd > 1 or mstridx == -1:
-                    if ymd[0] > 31:
-                        res.year = ymd[0]
-                    else:
-                        res.day = ymd[0]
-            elif len_ymd == 2:
-                # Two members with numbers
-                if ymd[0] > 31:
-                    # 99-01
-                    res.year, res.month = ymd
-                elif ymd[1] > 31:
-                    # 01-99
-                    res.month, res.year = ymd
-                elif dayfirst and ymd[1] <= 12:
-                    # 13-01
-                    res.day, res.month = ymd
-                else:
-                    # 01-13
-                    res.month, res.day = ymd
-            if len_ymd == 3:
-                # Three members
-                if mstridx == 0:
-                    res.month, res.day, res.year = ymd
-                elif mstridx == 1:
-                    if ymd[0] > 31 or (yearfirst and ymd[2] <= 31):
-                        # 99-Jan-01
-                        res.year, res.month, res.day = ymd
-                    else:
-                        # 01-Jan-01
-                        # Give precendence to day-first, since
-                        # two-digit years is usually hand-written.
-                        res.day, res.month, res.year = ymd
-                elif mstridx == 2:
-                    # WTF!?
-                    if ymd[1] > 31:
-                        # 01-99-Jan
-                        res.day, res.year, res.month = ymd
-                    else:
-                        # 99-01-Jan
-                        res.year, res.day, res.month = ymd
+        except (IndexError, ValueError, AssertionError) as e:
+            if trace is not None:
+                trace.error = e.__class__.__name__
+            return None
+
+        if not info.validate(res):
+            return None
+        return res
+
+    def _retoken(self, timestr):
+        # Tokens and shape codes for a string with the same digit
+        # pattern as the last one, and the index of the first token
+        # that changed.
+        tokens = self._lasttokens[:]
+        codes = self._lastshape[1]
+        changed = len(tokens)
+        for i, start, end in self._numspans:
+            token = timestr[start:end]
+            if token != tokens[i]:
+                if changed > i:
+                    changed = i
+                tokens[i] = token
+                if not (token[0] in "0123456789" and
+                        token[-1] in "0123456789"):
+                    # Not a number, so it may be classified differently.
+                    codes = codes[:i]+self._shape([token])+codes[i+1:]
+        return tokens, codes, changed
+
+    def _findnumspans(self, tokens):
+        spans = []
+        start = 0
+        for i, token in enumerate(tokens):
+            end = start+len(token)
+            if [x for x in token if x in "0123456789"]:
+                spans.append((i, start, end))
+            start = end
+        return spans
+
+    def _replay(self, ops, l, shape, changed):
+        # Replays ops over l, skipping those reading only tokens before
+        # the changed index when there's a snapshot of the fields after
+        # them.
+        #
+        # Number of leading operations not affected by the change.
+        reaches = self._reaches.get(shape)
+        if reaches is None:
+            reaches = self._opreaches(ops)
+            if len(self._reaches) >= self._SHAPECACHESIZE:
+                self._reaches.clear()
+            self._reaches[shape] = reaches
+        safe = bisect.bisect_left(reaches, changed)
+
+        res = self._result()
+        ymd = []
+        start = 0
+        # The snapshot is only kept if it's still valid for this string.
+        snapshot = self._snapshot
+        self._snapshot = None
+        if (snapshot is not None and snapshot[0] == shape and
+            snapshot[1] <= safe):
+            start = snapshot[1]
+            for attr, value in snapshot[2]:
+                setattr(res, attr, value)
+            ymd.extend(snapshot[3])
+        else:
+            snapshot = None
+        # Unless it's the one restored, take a snapshot after the last
+        # safe operation for the next string.
+        take = snapshot is None or start != safe
+        if not take:
+            self._snapshot = snapshot
+        info = self.info
+        for i in range(start, len(ops)):
+            if i == safe and take:
+                self._takesnapshot(shape, safe, res, ymd)
+            op, args = ops[i]
+            op(info, res, ymd, l, *args)
+        if safe == len(ops) and take:
+            self._takesnapshot(shape, safe, res, ymd)
+        return res, ymd
+
+    def _opreaches(self, ops):
+        # For each operation, the highest token index read by it or by
+        # any operation before it.
+        reach = self._OPREACH
+        reaches = []
+        highest = -1
+        for op, args in ops:
+            highest = max(highest, max(args)+reach.get(op, 0))
+            reaches.append(highest)
+        return reaches
+
+    def _takesnapshot(self, shape, count, res, ymd):
+        fields = []
+        for attr in res.__slots__:
+            value = getattr(res, attr)
+            if value is not None:
+                fields.append((attr, value))
+        self._snapshot = (shape, count, fields, ymd[:])
+
+
+class _ymdslot(int):
+    # A ymd member that knows its position, so that formatparser can
+    # tell where _resolveymd() puts it.
+    def __new__(cls, value, index):
+        self = int.__new__(cls, value)
+        self.index = index
+        return self
+
+
+class formatparser(parser):
+    """Parser for strings that all share the layout of some samples.
+
+    The samples are scanned once with the usual token cascade. They must
+    all go through the same operations, with the same separators, and
+    numbers and names of the same kind in the same places. The day and
+    year order is fixed to one fitting every sample, trying the
+    parserinfo's dayfirst and yearfirst first. Strings are then matched
+    against a regular expression built for that layout and decoded
+    without any guessing. Those that don't match, or give an impossible
+    date, are rejected, or handed to the generic parser if fallback is
+    true.
+    """
+
+    # Kinds of the tokens that may change from string to string, by
+    # the operation reading them.
+    _SLOTKINDS = {_op_ymdmonth: "month", _op_weekday: "weekday",
+                  _op_ampm: "ampm", _op_hourampm: "ampm",
+                  _op_tzname: "tzname", _op_tzabbr: "tzabbr",
+                  _op_tzreverse: "sign", _op_tzhhmm: "sign",
+                  _op_tzhh_mm: "sign", _op_tzhh: "sign"}
+
+    _KINDPATTERNS = {"month": _retimelex._wordclass+"+",
+                     "weekday": _retimelex._wordclass+"+",
+                     "ampm": _retimelex._wordclass+"+",
+                     "tzname": "[A-Z]{1,5}",
+                     "tzabbr": "[A-Z]{3,5}",
+                     "sign": "[+-]"}
+
+    _NUMBER_RE = re.compile(r"([0-9]+)(?:\.([0-9]+))?\Z")
+
+    def __init__(self, samples, info=None, fallback=False, cachesize=0,
+                       tzcachesize=0, stats=None):
+        parser.__init__(self, info, cachesize, tzcachesize, stats)
+        self.fallback = fallback
+        # The layout decides what an ISO-8601 string means.
+        self._isofastpath = False
+        self._samples = tuple(samples)
+        self._learn(self._samples)
+
+    def _initargs(self):
+        return (self._samples, self.info, self.fallback)
+
+    def _learn(self, samples):
+        scans = []
+        layout = None
+        for timestr in samples:
+            l = self._lexer.split(timestr)
+            ops = []
+            try:
+                # _scan() may change the tokens, so give it a copy.
+                scanned = self._scan(l[:], False, ops)
+            except (IndexError, ValueError, AssertionError):
+                scanned = None
+            if scanned is None:
+                raise ValueError("unknown string format: %r" % (timestr,))
+            res, ymd, mstridx = scanned
+            if layout is None:
+                layout = (ops, mstridx, len(l))
+            elif layout != (ops, mstridx, len(l)):
+                raise ValueError("samples don't share one layout")
+            scans.append((l, ymd))
+        if not scans:
+            raise ValueError("no samples given")
+        self._ops, mstridx = layout[:2]
+
+        kinds = {}
+        for op, args in self._ops:
+            kind = self._SLOTKINDS.get(op)
+            if kind is not None:
+                kinds[args[-1]] = kind
+        tokens = scans[0][0]
+        parts = []
+        slots = []
+        checks = []
+        for i, token in enumerate(tokens):
+            column = [l[i] for l, ymd in scans]
+            kind = kinds.get(i)
+            if kind is None:
+                numbers = [self._NUMBER_RE.match(x) for x in column]
+                if None not in numbers:
+                    slots.append(i)
+                    parts.append("(%s)" % self._numberpattern(numbers))
+                elif column.count(token) != len(column):
+                    raise ValueError("samples don't share one layout")
+                elif token == " ":
+                    parts.append("[%s]" % re.escape(_timelex.whitespace))
                 else:
-                    if ymd[0] > 31 or \
-                       (yearfirst and ymd[1] <= 12 and ymd[2] <= 31):
-                        # 99-01-01
-                        res.year, res.month, res.day = ymd
-                    elif ymd[0] > 12 or (dayfirst and ymd[1] <= 12):
-                        # 13-01-01
-                        res.day, res.month, res.year = ymd
-                    else:
-                        # 01-13-01
-                        res.month, res.day, res.year = ymd
+                    parts.append(re.escape(token))
+            else:
+                if kind in ("month", "weekday", "ampm", "tzname"):
+                    checks.append((len(slots), kind))
+                slots.append(i)
+                parts.append("(%s)" % self._KINDPATTERNS[kind])
+        self.pattern = re.compile("".join(parts)+r"\Z", re.UNICODE)
+        self._tokens = tokens
+        self._slots = slots
+        self._checks = checks
 
-        except (IndexError, ValueError, AssertionError):
+        info = self.info
+        orders = [(info.dayfirst, info.yearfirst)]
+        for order in [(False, False), (True, False),
+                      (False, True), (True, True)]:
+            if order not in orders:
+                orders.append(order)
+        for dayfirst, yearfirst in orders:
+            found = set([self._ymdorder(ymd, mstridx, dayfirst, yearfirst)
+                         for l, ymd in scans])
+            if len(found) == 1 and None not in found:
+                self.dayfirst = dayfirst
+                self.yearfirst = yearfirst
+                self._order = found.pop()
+                break
+        else:
+            raise ValueError("no day and year order fits all samples")
+
+    def _numberpattern(self, numbers):
+        # Only the widths seen in the samples are accepted, since the
+        # width of a number may change the way it's read.
+        widths = set([(len(m.group(1)), m.group(2) and len(m.group(2)))
+                      for m in numbers])
+        intwidths = sorted([width for width, fraction in widths])
+        if (not [w for w in widths if w[1]] and
+            intwidths == list(range(intwidths[0], intwidths[-1]+1))):
+            if intwidths[0] == intwidths[-1]:
+                return "[0-9]{%d}" % intwidths[0]
+            return "[0-9]{%d,%d}" % (intwidths[0], intwidths[-1])
+        alternatives = []
+        for width, fraction in sorted(widths, reverse=True):
+            if fraction:
+                alternatives.append("[0-9]{%d}\\.[0-9]{%d}"
+                                    % (width, fraction))
+            else:
+                alternatives.append("[0-9]{%d}" % width)
+        return "|".join(alternatives)
+
+    def _ymdorder(self, ymd, mstridx, dayfirst, yearfirst):
+        # The field each ymd member goes to, or None if they don't
+        # make a valid date.
+        res = self._result()
+        if not self._resolveymd(res, [_ymdslot(value, i)
+                                      for i, value in enumerate(ymd)],
+                                mstridx, dayfirst, yearfirst):
+            return None
+        if (res.month is not None and not 1 <= res.month <= 12 or
+            res.day is not None and not 1 <= res.day <= 31):
             return None
+        order = [None]*len(ymd)
+        for attr in ("year", "month", "day"):
+            value = getattr(res, attr)
+            if value is not None:
+                order[value.index] = attr
+        return tuple(order)
+
+    def _parse(self, timestr, dayfirst=None, yearfirst=None, fuzzy=False,
+                     epoch=None):
+        trace = None
+        stats = self.stats
+        if stats is not None:
+            trace = stats._trace
+            if trace is None:
+                return stats._measure(self._parse, timestr, dayfirst,
+                                      yearfirst, fuzzy, epoch)
+        if not isinstance(timestr, (text_type, binary_type)):
+            timestr = timestr.read()
+        res = None
+        if epoch:
+            res = self._parseepoch(timestr, epoch)
+            if trace is not None and res is not None:
+                trace.path = "epoch"
+        if res is None:
+            res = self._decode(timestr)
+            if trace is not None:
+                trace.path = "format"
+        if res is None and self.fallback:
+            if dayfirst is None:
+                dayfirst = self.dayfirst
+            if yearfirst is None:
+                yearfirst = self.yearfirst
+            res = parser._parse(self, timestr, dayfirst, yearfirst, fuzzy)
+            if trace is not None:
+                trace.path = "fallback"
+        return res
 
+    def _decode(self, timestr):
+        # Decodes timestr following the layout, or returns None if it
+        # doesn't fit it.
+        m = self.pattern.match(timestr)
+        if m is None:
+            return None
+        info = self.info
+        groups = m.groups()
+        for n, kind in self._checks:
+            # Names must be taken for what they were in the samples,
+            # checking in the same order as _scan() does.
+            roles = info.classify(groups[n])
+            if roles.weekday is not None:
+                found = "weekday"
+            elif roles.month is not None:
+                found = "month"
+            elif roles.ampm is not None:
+                found = "ampm"
+            else:
+                found = "tzname"
+            if found != kind:
+                return None
+        l = self._tokens[:]
+        for i, token in zip(self._slots, groups):
+            l[i] = token
+        res = self._result()
+        ymd = []
+        try:
+            for op, args in self._ops:
+                op(info, res, ymd, l, *args)
+        except (IndexError, ValueError, AssertionError):
+            return None
+        for attr, value in zip(self._order, ymd):
+            setattr(res, attr, value)
+        if (res.month is not None and not 1 <= res.month <= 12 or
+            res.day is not None and not 1 <= res.day <= 31):
+            return None
         if not info.validate(res):
             return None
         return res
 
+
 DEFAULTPARSER = parser()
 def parse(timestr, parserinfo=None, **kwargs):
     # Python 2.x support: datetimes return their string presentation as
     # bytes in 2.x and unicode in 3.x, so it's reasonable to expect that
-    # the parser will get both kinds. Internally we use unicode only.
-    if isinstance(timestr, binary_type):
-        timestr = timestr.decode()
+    # the parser will get both kinds. Bytes go through parse_buffer(),
+    # which only decodes them if they aren't in ISO-8601 format.
+    if isinstance(timestr, _BUFFERTYPES):
+        if parserinfo:
+            return parser(parserinfo).parse_buffer(timestr, **kwargs)
+        else:
+            return DEFAULTPARSER.parse_buffer(timestr, **kwargs)
     if parserinfo:
         return parser(parserinfo).parse(timestr, **kwargs)
     else:
         return DEFAULTPARSER.parse(timestr, **kwargs)
 
+def parse_many(timestrs, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_many(timestrs, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_many(timestrs, **kwargs)
+
+_WORKERSTATE = None
+
+def _parallelinit(state):
+    # Runs once in each parse_many() worker process.
+    global _WORKERSTATE
+    cls, args, default, ignoretz, tzinfos, kwargs, build = state
+    p = cls(*args)
+    if build is not None:
+        build = getattr(p, build)
+    _WORKERSTATE = (p, default, ignoretz, tzinfos, kwargs, build)
+
+def _parallelchunk(args):
+    mode, items = args
+    p, default, ignoretz, tzinfos, kwargs, build = _WORKERSTATE
+    if mode == "list":
+        errors = []
+    else:
+        errors = mode
+    results = [ret for i, ret in p._iterparsegen(items, None, default,
+                                                 ignoretz, tzinfos, errors,
+                                                 kwargs, build)]
+    if mode == "list":
+        return results, errors
+    return results, None
+
+def parse_epoch(timestr, parserinfo=None, **kwargs):
+    if isinstance(timestr, binary_type):
+        timestr = timestr.decode()
+    if parserinfo:
+        return parser(parserinfo).parse_epoch(timestr, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_epoch(timestr, **kwargs)
+
+def parse_many_epoch(timestrs, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_many_epoch(timestrs, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_many_epoch(timestrs, **kwargs)
+
+def parse_fields(timestr, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_fields(timestr, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_fields(timestr, **kwargs)
+
+def parse_many_fields(timestrs, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_many_fields(timestrs, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_many_fields(timestrs, **kwargs)
+
+def parse_buffer(buf, start=0, end=None, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_buffer(buf, start, end, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_buffer(buf, start, end, **kwargs)
+
+def parse_buffer_many(buf, spans, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).parse_buffer_many(buf, spans, **kwargs)
+    else:
+        return DEFAULTPARSER.parse_buffer_many(buf, spans, **kwargs)
+
+def timeindex(fileobj, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).timeindex(fileobj, **kwargs)
+    else:
+        return DEFAULTPARSER.timeindex(fileobj, **kwargs)
+
+def inferformat(samples, parserinfo=None, **kwargs):
+    return formatparser(samples, parserinfo, **kwargs)
+
+def search_dates(text, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).search_dates(text, **kwargs)
+    else:
+        return DEFAULTPARSER.search_dates(text, **kwargs)
+
+def iterparse(fileobj, parserinfo=None, **kwargs):
+    if parserinfo:
+        return parser(parserinfo).iterparse(fileobj, **kwargs)
+    else:
+        return DEFAULTPARSER.iterparse(fileobj, **kwargs)
+
+
+_ISO8601_RE = re.compile(r"([0-9]{4})(-?)([0-9]{2})\2([0-9]{2})"
+                         r"(?:[Tt ]([0-9]{2})"
+                         r"(?:(:?)([0-9]{2})"
+                         r"(?:\6([0-9]{2})(?:([.,])([0-9]+))?)?)?"
+                         r"(?:([Zz])|([+-])([0-9]{2})(?::?([0-9]{2}))?)?)?\Z")
+_ISO8601_BRE = re.compile(_ISO8601_RE.pattern.encode())
+
+# Whitespace separated fields, for parser.timeindex().
+_FIELD_BRE = re.compile(b"[^ \t\r\n\x0b\x0c]+")
+
+# Unix timestamps, for parse(..., epoch=...).
+_EPOCH_RE = re.compile(r"\s*(-?)([0-9]+)(?:\.([0-9]+))?\s*\Z")
+_EPOCH_BRE = re.compile(_EPOCH_RE.pattern.encode())
+
+# Values of the two digit fields of _ISO8601_RE, and of the ones it
+# leaves out, since int() is slow for them.
+_ISODIGITS = dict(("%02d" % i, i) for i in range(100))
+_ISODIGITS[None] = 0
+
+# The tzoffsets of the ISO-8601 offsets seen, by (sign, hours, minutes)
+# as matched, and None for the zero offsets. There are at most 2*100*101
+# of them.
+_ISOOFFSETS = {}
+
+def _isooffset(sign, tzhour, tzminute):
+    try:
+        return _ISOOFFSETS[sign, tzhour, tzminute]
+    except KeyError:
+        offset = int(tzhour)*3600+int(tzminute or 0)*60
+        if sign == '-':
+            offset = -offset
+        tzinfo = None
+        if offset:
+            tzinfo = tz.tzoffset(None, offset)
+        _ISOOFFSETS[sign, tzhour, tzminute] = tzinfo
+        return tzinfo
+
+# What parser.search_dates() looks for first.
+_DIGITS_RE = re.compile(r"[0-9]+")
+
+def isoparse(timestr):
+    """Parse a strict ISO-8601 / RFC 3339 date and time.
+
+    Accepts YYYY-MM-DD or YYYYMMDD, optionally followed by "T" (or a
+    space), hh[:mm[:ss[.ffffff]]] and a "Z" or +hh[:mm] offset. Both the
+    extended and basic formats are allowed. Raises ValueError for
+    anything else, instead of guessing like parse() does.
+    """
+    if isinstance(timestr, binary_type):
+        timestr = timestr.decode()
+    m = _ISO8601_RE.match(timestr)
+    if m is None:
+        raise ValueError("unknown string format")
+    (year, datesep, month, day, hour, timesep, minute, second,
+     fracsep, fraction, utc, sign, tzhour, tzminute) = m.groups()
+    tzinfo = None
+    if sign:
+        tzinfo = _isooffset(sign, tzhour, tzminute)
+    if tzinfo is None and (utc or sign):
+        tzinfo = tz.tzutc()
+    microsecond = 0
+    if fraction:
+        fraction = fraction[:6]
+        microsecond = int(fraction)*10**(6-len(fraction))
+    digits = _ISODIGITS
+    return datetime.datetime(int(year), digits[month], digits[day],
+                             digits[hour], digits[minute], digits[second],
+                             microsecond, tzinfo)
+
 
 class _tzparser(object):
 
@@ -6,13 +6,18 @@ datetime module.
 """
 __license__ = "Simplified BSD"
 
-from six import string_types, PY3
+from six import string_types, binary_type, PY3
+from six.moves import builtins
 
 import datetime
+import array
+import bisect
+import mmap
 import struct
 import time
 import sys
 import os
+import threading
 
 relativedelta = None
 parser = None
@@ -42,6 +47,102 @@ def tzname_in_python2(myfunc):
 ZERO = datetime.timedelta(0)
 EPOCHORDINAL = datetime.datetime.utcfromtimestamp(0).toordinal()
 
+# Buffers tzfile() parses in place. On Python 2, bytes are str, and
+# taken as a filename. Python 2.6 has no memoryview.
+_BUFFERTYPES = tuple(t for t in (binary_type, bytearray,
+                                 getattr(builtins, "memoryview", None),
+                                 mmap.mmap)
+                     if t is not None)
+
+try:
+    array.array("q")
+    _INT64 = "q"
+except ValueError:
+    # No long long arrays before Python 3.3, but long is 64 bits
+    # wide on LP64 platforms.
+    _INT64 = "l"
+
+class _lrucache(object):
+    """Mapping keeping only the maxsize most recently used entries.
+
+    hits and misses count the get() calls that found, or didn't find,
+    the key.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._map = {}
+        # Circular doubly linked list of [prev, next, key, value]
+        # links, from the least to the most recently used.
+        self._root = root = []
+        root[:] = [root, root, None, None]
+
+    def __len__(self):
+        return len(self._map)
+
+    def __contains__(self, key):
+        return key in self._map
+
+    def get(self, key, default=None):
+        link = self._map.get(key)
+        if link is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._touch(link)
+        return link[3]
+
+    def __setitem__(self, key, value):
+        link = self._map.get(key)
+        if link is not None:
+            link[3] = value
+            self._touch(link)
+            return
+        if self.maxsize <= 0:
+            return
+        root = self._root
+        if len(self._map) >= self.maxsize:
+            self._evict()
+        last = root[0]
+        link = [last, root, key, value]
+        last[1] = root[0] = self._map[key] = link
+
+    def _evict(self):
+        # Drop the least recently used entry.
+        root = self._root
+        oldest = root[1]
+        root[1] = oldest[1]
+        oldest[1][0] = root
+        del self._map[oldest[2]]
+
+    def resize(self, maxsize):
+        self.maxsize = maxsize
+        while len(self._map) > max(maxsize, 0):
+            self._evict()
+
+    def _touch(self, link):
+        # Move link to the most recently used end.
+        prev, next = link[0], link[1]
+        prev[1] = next
+        next[0] = prev
+        root = self._root
+        last = root[0]
+        last[1] = root[0] = link
+        link[0] = last
+        link[1] = root
+
+    def clear(self):
+        self._map.clear()
+        root = self._root
+        root[:] = [root, root, None, None]
+        self.hits = self.misses = 0
+
+    def __repr__(self):
+        return "%s(maxsize=%d, size=%d, hits=%d, misses=%d)" % (
+               self.__class__.__name__, self.maxsize, len(self._map),
+               self.hits, self.misses)
+
 class tzutc(datetime.tzinfo):
 
     def utcoffset(self, dt):
@@ -166,13 +267,36 @@ class tzlocal(datetime.tzinfo):
 
     __reduce__ = object.__reduce__
 
+def _datetime_to_timestamp(dt):
+    # Seconds since the epoch for dt, taken as naive and truncated to
+    # the second.
+    return ((dt.toordinal() - EPOCHORDINAL) * 86400
+            + dt.hour * 3600
+            + dt.minute * 60
+            + dt.second)
+
 class _ttinfo(object):
     __slots__ = ["offset", "delta", "isdst", "abbr", "isstd", "isgmt"]
 
+    # Instances made by _shared(), by their fields.
+    _instances = {}
+
     def __init__(self):
         for attr in self.__slots__:
             setattr(self, attr, None)
 
+    @classmethod
+    def _shared(cls, key):
+        # The ttinfo with the given (offset, isdst, abbr, isstd, isgmt),
+        # shared by all the zones using it. It mustn't be changed.
+        tti = cls._instances.get(key)
+        if tti is None:
+            tti = cls()
+            tti.offset, tti.isdst, tti.abbr, tti.isstd, tti.isgmt = key
+            tti.delta = datetime.timedelta(seconds=tti.offset)
+            tti = cls._instances.setdefault(key, tti)
+        return tti
+
     def __repr__(self):
         l = []
         for attr in self.__slots__:
@@ -210,14 +334,24 @@ class tzfile(datetime.tzinfo):
     # http://www.twinsun.com/tz/tz-link.htm
     # ftp://ftp.iana.org/tz/tz*.tar.gz
     
-    def __init__(self, fileobj):
+    def __init__(self, fileobj, filename=None):
+        # Everything is parsed from a buffer, with unpack_from() at
+        # computed offsets.
         if isinstance(fileobj, string_types):
             self._filename = fileobj
-            fileobj = open(fileobj, 'rb')
-        elif hasattr(fileobj, "name"):
-            self._filename = fileobj.name
+            with open(fileobj, 'rb') as f:
+                buf = f.read()
+        elif isinstance(fileobj, _BUFFERTYPES):
+            self._filename = "<%s>" % fileobj.__class__.__name__
+            buf = fileobj
         else:
-            self._filename = repr(fileobj)
+            if hasattr(fileobj, "name"):
+                self._filename = fileobj.name
+            else:
+                self._filename = repr(fileobj)
+            buf = fileobj.read()
+        if filename is not None:
+            self._filename = filename
 
         # From tzfile(5):
         #
@@ -229,11 +363,9 @@ class tzfile(datetime.tzinfo):
         # ``standard'' byte order (the high-order  byte
         # of the value is written first).
 
-        if fileobj.read(4).decode() != "TZif":
+        if len(buf) < 4 or struct.unpack_from("4s", buf)[0] != b"TZif":
             raise ValueError("magic not found")
 
-        fileobj.read(16)
-
         (
          # The number of UTC/local indicators stored in the file.
          ttisgmtcnt,
@@ -257,7 +389,8 @@ class tzfile(datetime.tzinfo):
          # abbreviation strings" stored in the file.
          charcnt,
 
-        ) = struct.unpack(">6l", fileobj.read(24))
+        ) = struct.unpack_from(">6l", buf, 20)
+        offset = 44
 
         # The above header is followed by tzh_timecnt four-byte
         # values  of  type long,  sorted  in ascending order.
@@ -266,11 +399,8 @@ class tzfile(datetime.tzinfo):
         # time(2)) at which the rules for computing local time
         # change.
 
-        if timecnt:
-            self._trans_list = struct.unpack(">%dl" % timecnt,
-                                             fileobj.read(timecnt*4))
-        else:
-            self._trans_list = []
+        self._trans_list = struct.unpack_from(">%dl" % timecnt, buf, offset)
+        offset += timecnt*4
 
         # Next come tzh_timecnt one-byte values of type unsigned
         # char; each one tells which of the different types of
@@ -279,11 +409,8 @@ class tzfile(datetime.tzinfo):
         # serve as indices into an array of ttinfo structures that
         # appears next in the file.
         
-        if timecnt:
-            self._trans_idx = struct.unpack(">%dB" % timecnt,
-                                            fileobj.read(timecnt))
-        else:
-            self._trans_idx = []
+        trans_idx = struct.unpack_from("%ds" % timecnt, buf, offset)[0]
+        offset += timecnt
         
         # Each ttinfo structure is written as a four-byte value
         # for tt_gmtoff  of  type long,  in  a  standard  byte
@@ -296,12 +423,11 @@ class tzfile(datetime.tzinfo):
         # time zone abbreviation characters that follow the
         # ttinfo structure(s) in the file.
 
-        ttinfo = []
-
-        for i in range(typecnt):
-            ttinfo.append(struct.unpack(">lbb", fileobj.read(6)))
+        ttinfo = struct.unpack_from(">"+"lbb"*typecnt, buf, offset)
+        offset += typecnt*6
 
-        abbr = fileobj.read(charcnt).decode()
+        abbr = struct.unpack_from("%ds" % charcnt, buf, offset)[0].decode()
+        offset += charcnt
 
         # Then there are tzh_leapcnt pairs of four-byte
         # values, written in  standard byte  order;  the
@@ -313,9 +439,7 @@ class tzfile(datetime.tzinfo):
         # by time.
 
         # Not used, for now
-        if leapcnt:
-            leap = struct.unpack(">%dl" % (leapcnt*2),
-                                 fileobj.read(leapcnt*8))
+        offset += leapcnt*8
 
         # Then there are tzh_ttisstdcnt standard/wall
         # indicators, each stored as a one-byte value;
@@ -325,9 +449,8 @@ class tzfile(datetime.tzinfo):
         # a time zone file is used in handling POSIX-style
         # time zone environment variables.
 
-        if ttisstdcnt:
-            isstd = struct.unpack(">%db" % ttisstdcnt,
-                                  fileobj.read(ttisstdcnt))
+        isstd = struct.unpack_from(">%db" % ttisstdcnt, buf, offset)
+        offset += ttisstdcnt
 
         # Finally, there are tzh_ttisgmtcnt UTC/local
         # indicators, each stored as a one-byte value;
@@ -337,57 +460,68 @@ class tzfile(datetime.tzinfo):
         # is used in handling POSIX-style time zone envi-
         # ronment variables.
 
-        if ttisgmtcnt:
-            isgmt = struct.unpack(">%db" % ttisgmtcnt,
-                                  fileobj.read(ttisgmtcnt))
+        isgmt = struct.unpack_from(">%db" % ttisgmtcnt, buf, offset)
 
         # ** Everything has been read **
 
-        # Build ttinfo list
+        # Build ttinfo list, without repeating equal ttinfos, and
+        # sharing them with other zones.
         self._ttinfo_list = []
+        types = bytearray(range(256))
+        found = {}
         for i in range(typecnt):
-            gmtoff, isdst, abbrind =  ttinfo[i]
+            gmtoff, isdst, abbrind = ttinfo[i*3:i*3+3]
             # Round to full-minutes if that's not the case. Python's
             # datetime doesn't accept sub-minute timezones. Check
             # http://python.org/sf/1447945 for some information.
             gmtoff = (gmtoff+30)//60*60
-            tti = _ttinfo()
-            tti.offset = gmtoff
-            tti.delta = datetime.timedelta(seconds=gmtoff)
-            tti.isdst = isdst
-            tti.abbr = abbr[abbrind:abbr.find('\x00', abbrind)]
-            tti.isstd = (ttisstdcnt > i and isstd[i] != 0)
-            tti.isgmt = (ttisgmtcnt > i and isgmt[i] != 0)
-            self._ttinfo_list.append(tti)
-
-        # Replace ttinfo indexes for ttinfo objects.
-        trans_idx = []
-        for idx in self._trans_idx:
-            trans_idx.append(self._ttinfo_list[idx])
-        self._trans_idx = tuple(trans_idx)
+            key = (gmtoff, isdst, abbr[abbrind:abbr.find('\x00', abbrind)],
+                   ttisstdcnt > i and isstd[i] != 0,
+                   ttisgmtcnt > i and isgmt[i] != 0)
+            if key not in found:
+                found[key] = len(self._ttinfo_list)
+                self._ttinfo_list.append(_ttinfo._shared(key))
+            types[i] = found[key]
+
+        # Indexes in the new ttinfo list, by transition.
+        if len(found) < typecnt:
+            trans_idx = trans_idx.translate(bytes(types))
+        self._trans_idx = array.array("B", trans_idx)
 
         # Set standard, dst, and before ttinfos. before will be
         # used when a given time is before any transitions,
         # and will be set to the first non-dst ttinfo, or to
         # the first dst, if all of them are dst.
+        #
+        # Along the way, find the last std ttinfo at or before each
+        # transition, for dst() to need a single lookup.
         self._ttinfo_std = None
         self._ttinfo_dst = None
         self._ttinfo_before = None
+        self._trans_std = trans_std = array.array("B", self._trans_idx)
+        first = timecnt
         if self._ttinfo_list:
-            if not self._trans_list:
+            if not timecnt:
                 self._ttinfo_std = self._ttinfo_first = self._ttinfo_list[0]
             else:
-                for i in range(timecnt-1, -1, -1):
-                    tti = self._trans_idx[i]
-                    if not self._ttinfo_std and not tti.isdst:
-                        self._ttinfo_std = tti
-                    elif not self._ttinfo_dst and tti.isdst:
-                        self._ttinfo_dst = tti
-                    if self._ttinfo_std and self._ttinfo_dst:
-                        break
-                else:
-                    if self._ttinfo_dst and not self._ttinfo_std:
-                        self._ttinfo_std = self._ttinfo_dst
+                isdst = [tti.isdst for tti in self._ttinfo_list]
+                laststd = lastdst = None
+                for i, idx in enumerate(self._trans_idx):
+                    if isdst[idx]:
+                        lastdst = idx
+                        if laststd is not None:
+                            trans_std[i] = laststd
+                    else:
+                        if laststd is None:
+                            first = i
+                        laststd = idx
+                if lastdst is not None:
+                    self._ttinfo_dst = self._ttinfo_list[lastdst]
+                if laststd is None:
+                    laststd = lastdst
+                self._ttinfo_std = self._ttinfo_list[laststd]
+                # Before the first std time, the last one in the file.
+                trans_std[:first] = array.array("B", [laststd])*first
 
                 for tti in self._ttinfo_list:
                     if not tti.isdst:
@@ -403,43 +537,34 @@ class tzfile(datetime.tzinfo):
         # isgmt are off, so it should be in wall time. OTOH, it's
         # always in gmt time. Let me know if you have comments
         # about this.
-        laststdoffset = 0
-        self._trans_list = list(self._trans_list)
-        for i in range(len(self._trans_list)):
-            tti = self._trans_idx[i]
-            if not tti.isdst:
-                # This is std time.
-                self._trans_list[i] += tti.offset
-                laststdoffset = tti.offset
-            else:
-                # This is dst time. Convert to std.
-                self._trans_list[i] += laststdoffset
-        self._trans_list = tuple(self._trans_list)
+        #
+        # Std times are moved by their own offset, and dst times by
+        # the one of the last std time. There's no offset for dst
+        # times before the first std time. The UTC times are kept
+        # for fromutc().
+        trans_list = self._trans_list
+        self._trans_list_utc = array.array(_INT64, trans_list)
+        if first < timecnt:
+            offsets = [tti.offset for tti in self._ttinfo_list]
+            trans_list = (trans_list[:first]+
+                          tuple([trans_list[i]+offsets[trans_std[i]]
+                                 for i in range(first, timecnt)]))
+        self._trans_list = array.array(_INT64, trans_list)
+
+    def _find_idx(self, dt):
+        # Number of transitions at or before dt, in wall time.
+        return bisect.bisect_right(self._trans_list,
+                                   _datetime_to_timestamp(dt))
 
     def _find_ttinfo(self, dt, laststd=0):
-        timestamp = ((dt.toordinal() - EPOCHORDINAL) * 86400
-                     + dt.hour * 3600
-                     + dt.minute * 60
-                     + dt.second)
-        idx = 0
-        for trans in self._trans_list:
-            if timestamp < trans:
-                break
-            idx += 1
-        else:
+        idx = self._find_idx(dt)
+        if idx == len(self._trans_list):
             return self._ttinfo_std
         if idx == 0:
             return self._ttinfo_before
         if laststd:
-            while idx > 0:
-                tti = self._trans_idx[idx-1]
-                if not tti.isdst:
-                    return tti
-                idx -= 1
-            else:
-                return self._ttinfo_std
-        else:
-            return self._trans_idx[idx-1]
+            return self._ttinfo_list[self._trans_std[idx-1]]
+        return self._ttinfo_list[self._trans_idx[idx-1]]
 
     def utcoffset(self, dt):
         if not self._ttinfo_std:
@@ -449,13 +574,17 @@ class tzfile(datetime.tzinfo):
     def dst(self, dt):
         if not self._ttinfo_dst:
             return ZERO
-        tti = self._find_ttinfo(dt)
+        idx = self._find_idx(dt)
+        if idx == len(self._trans_list) or idx == 0:
+            # Both ttinfos are the same one.
+            return ZERO
+        tti = self._ttinfo_list[self._trans_idx[idx-1]]
         if not tti.isdst:
             return ZERO
 
         # The documentation says that utcoffset()-dst() must
         # be constant for every dt.
-        return tti.delta-self._find_ttinfo(dt, laststd=1).delta
+        return tti.delta-self._ttinfo_list[self._trans_std[idx-1]].delta
 
         # An alternative for that would be:
         #
@@ -471,6 +600,25 @@ class tzfile(datetime.tzinfo):
             return None
         return self._find_ttinfo(dt).abbr
 
+    def fromutc(self, dt):
+        # The default implementation calls utcoffset() and dst() a few
+        # times. The UTC transition times give the ttinfo at once.
+        if not isinstance(dt, datetime.datetime):
+            raise TypeError("fromutc() requires a datetime argument")
+        if dt.tzinfo is not self:
+            raise ValueError("dt.tzinfo is not self")
+        if not self._ttinfo_std:
+            return dt
+        idx = bisect.bisect_right(self._trans_list_utc,
+                                  _datetime_to_timestamp(dt))
+        if idx == len(self._trans_list_utc):
+            tti = self._ttinfo_std
+        elif idx == 0:
+            tti = self._ttinfo_before
+        else:
+            tti = self._ttinfo_list[self._trans_idx[idx-1]]
+        return dt+tti.delta
+
     def __eq__(self, other):
         if not isinstance(other, tzfile):
             return False
@@ -571,8 +719,36 @@ class tzrange(datetime.tzinfo):
     __reduce__ = object.__reduce__
 
 class tzstr(tzrange):
-    
+    # Parsed instances are interned by string in an LRU cache, so
+    # they're frozen once built. See tzstr.cache.resize().
+    cache = _lrucache(128)
+    _cachelock = threading.Lock()
+
+    def __new__(cls, s=None):
+        if s is None:
+            # Unpickling or copying, which restores __dict__ afterwards.
+            return tzrange.__new__(cls)
+        key = (cls, s)
+        with cls._cachelock:
+            self = cls.cache.get(key)
+        if self is None:
+            self = tzrange.__new__(cls)
+            self._init(s)
+            self.__dict__["_frozen"] = True
+            with cls._cachelock:
+                cls.cache[key] = self
+        return self
+
     def __init__(self, s):
+        # Everything was set up by __new__().
+        pass
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError("tzstr instances are immutable")
+        tzrange.__setattr__(self, name, value)
+
+    def _init(self, s):
         global parser
         if not parser:
             from dateutil import parser
@@ -886,13 +1062,43 @@ else:
     TZFILES = []
     TZPATHS = []
 
+# Zones found by gettz(), by name, including the names that weren't
+# found. If GETTZ_CHECKMTIME is true, zones read from a file are read
+# again when its modification time changes.
+GETTZ_CACHE = _lrucache(128)
+GETTZ_CHECKMTIME = False
+_gettzlock = threading.Lock()
+
+def _getmtime(filename):
+    try:
+        return os.stat(filename).st_mtime
+    except (IOError, OSError):
+        return None
+
 def gettz(name=None):
-    tz = None
     if not name:
         try:
             name = os.environ["TZ"]
         except KeyError:
             pass
+    with _gettzlock:
+        entry = GETTZ_CACHE.get(name)
+    if entry is not None:
+        tz, filename, mtime = entry
+        if (filename is None or not GETTZ_CHECKMTIME or
+            _getmtime(filename) == mtime):
+            return tz
+    tz = _gettz(name)
+    filename = mtime = None
+    if isinstance(tz, tzfile) and os.path.isfile(tz._filename):
+        filename = tz._filename
+        mtime = _getmtime(filename)
+    with _gettzlock:
+        GETTZ_CACHE[name] = (tz, filename, mtime)
+    return tz
+
+def _gettz(name):
+    tz = None
     if name is None or name == ":":
         for filepath in TZFILES:
             if not os.path.isabs(filepath):
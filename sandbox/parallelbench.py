@@ -0,0 +1,39 @@
+"""
+Measures how parse_many() throughput scales with the number of worker
+processes. Run it from the top of the source tree:
+
+    python sandbox/parallelbench.py [rows] [max workers]
+"""
+import sys
+import time
+import multiprocessing
+
+sys.path.insert(0, ".")
+from dateutil.parser import parse_many
+
+FORMATS = ["Thu Sep %d 10:36:28 BRST 2003",
+           "2003-09-%02dT10:49:41.5-03:00",
+           "%d Sep 2003 10:49:41 PM"]
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    maxworkers = (int(sys.argv[2]) if len(sys.argv) > 2
+                  else multiprocessing.cpu_count())
+    strs = [FORMATS[i%3] % (i%28+1) for i in range(rows)]
+    tzinfos = {"BRST": -10800}
+    start = time.time()
+    parse_many(strs, tzinfos=tzinfos)
+    serial = time.time()-start
+    print("%d rows, %d cpus" % (rows, multiprocessing.cpu_count()))
+    print("serial:     %6.2fs %9d rows/s" % (serial, rows/serial))
+    workers = 1
+    while workers <= maxworkers:
+        start = time.time()
+        parse_many(strs, tzinfos=tzinfos, workers=workers)
+        elapsed = time.time()-start
+        print("workers=%-3d %6.2fs %9d rows/s %5.2fx" %
+              (workers, elapsed, rows/elapsed, serial/elapsed))
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
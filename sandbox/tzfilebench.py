@@ -0,0 +1,76 @@
+"""
+Compares tzfile lookups by bisection against the linear scan over the
+transitions used before. Run it from the top of the source tree:
+
+    python sandbox/tzfilebench.py [zone] [lookups]
+"""
+import sys
+import time
+import datetime
+
+sys.path.insert(0, ".")
+from dateutil import tz
+
+ZERO = datetime.timedelta(0)
+
+class scantzfile(tz.tzfile):
+    """tzfile with the old linear scan lookups."""
+
+    def _find_ttinfo(self, dt, laststd=0):
+        timestamp = ((dt.toordinal() - tz.EPOCHORDINAL) * 86400
+                     + dt.hour * 3600
+                     + dt.minute * 60
+                     + dt.second)
+        idx = 0
+        for trans in self._trans_list:
+            if timestamp < trans:
+                break
+            idx += 1
+        else:
+            return self._ttinfo_std
+        if idx == 0:
+            return self._ttinfo_before
+        if laststd:
+            while idx > 0:
+                tti = self._ttinfo_list[self._trans_idx[idx-1]]
+                if not tti.isdst:
+                    return tti
+                idx -= 1
+            else:
+                return self._ttinfo_std
+        else:
+            return self._ttinfo_list[self._trans_idx[idx-1]]
+
+    def dst(self, dt):
+        if not self._ttinfo_dst:
+            return ZERO
+        tti = self._find_ttinfo(dt)
+        if not tti.isdst:
+            return ZERO
+        return tti.delta-self._find_ttinfo(dt, laststd=1).delta
+
+def bench(zone, dts):
+    start = time.time()
+    for dt in dts:
+        zone.utcoffset(dt)
+        zone.dst(dt)
+        zone.tzname(dt)
+    return time.time()-start
+
+def main():
+    name = sys.argv[1] if len(sys.argv) > 1 else "America/New_York"
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    path = tz.gettz(name)._filename
+    old, new = scantzfile(path), tz.tzfile(path)
+    print("%s: %d transitions, %d lookups of utcoffset(), dst() and "
+          "tzname()" % (name, len(new._trans_list), lookups))
+    for first, last in [(1970, 1971), (2000, 2030)]:
+        start = datetime.datetime(first, 1, 1)
+        step = datetime.timedelta(days=365*(last-first))//lookups
+        dts = [start+step*i for i in range(lookups)]
+        scan, bisect = bench(old, dts), bench(new, dts)
+        print("%d-%d: scan %6.3fs  bisect %6.3fs  %5.1fx" %
+              (first, last, scan, bisect, scan/bisect))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Measures how long loading every zone of a zoneinfo directory takes,
+from file names, from file objects, and from buffers already in
+memory. Run it from the top of the source tree:
+
+    python sandbox/tzloadbench.py [zoneinfo directory] [rounds]
+"""
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, ".")
+from dateutil import tz
+
+def zonefiles(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as fileobj:
+                if fileobj.read(4) == b"TZif":
+                    yield path
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else "/usr/share/zoneinfo"
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    paths = list(zonefiles(root))
+    datas = []
+    for path in paths:
+        with open(path, "rb") as fileobj:
+            datas.append(fileobj.read())
+    # The whole database in one block, as it could be mapped from a
+    # single file, and views on each zone.
+    blob = bytearray(b"".join(datas))
+    views = []
+    start = 0
+    for data in datas:
+        views.append(memoryview(blob)[start:start+len(data)])
+        start += len(data)
+    print("%d zones, %d bytes" % (len(paths), len(blob)))
+    cases = [("names", lambda: [tz.tzfile(path) for path in paths]),
+             ("file objects",
+              lambda: [tz.tzfile(io.BytesIO(data)) for data in datas]),
+             ("bytearrays",
+              lambda: [tz.tzfile(bytearray(data)) for data in datas]),
+             ("memoryviews", lambda: [tz.tzfile(view) for view in views])]
+    for name, load in cases:
+        try:
+            load()
+        except Exception as e:
+            print("%-13s unsupported: %s" % (name, e))
+            continue
+        best = None
+        for i in range(rounds):
+            start = time.time()
+            load()
+            elapsed = time.time()-start
+            if best is None or elapsed < best:
+                best = elapsed
+        print("%-13s %6.3fs %7.1fus/zone" %
+              (name, best, best*1e6/len(paths)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Measures the memory kept by tzfile instances, loading every zone of a
+zoneinfo directory. Needs Python 3.4 or later for tracemalloc. Run it
+from the top of the source tree:
+
+    python sandbox/tzmemory.py [zoneinfo directory]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, ".")
+from dateutil import tz
+
+def zonefiles(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            with open(path, "rb") as fileobj:
+                if fileobj.read(4) == b"TZif":
+                    yield path
+
+def main():
+    root = sys.argv[1] if len(sys.argv) > 1 else "/usr/share/zoneinfo"
+    paths = list(zonefiles(root))
+    # Warm up, so that lazy imports and caches aren't counted.
+    tz.tzfile(paths[0])
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    zones = [tz.tzfile(path) for path in paths]
+    total = tracemalloc.get_traced_memory()[0]-before
+    tracemalloc.stop()
+    transitions = sum(len(zone._trans_list) for zone in zones)
+    print("%d zones, %d transitions" % (len(zones), transitions))
+    print("%d bytes, %d bytes per zone, %.1f bytes per transition" %
+          (total, total//len(zones), float(total)/transitions))
+    name = "America/New_York"
+    path = os.path.join(root, name)
+    if os.path.exists(path):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        zone = tz.tzfile(path)
+        print("%s: %d bytes" %
+              (name, tracemalloc.get_traced_memory()[0]-before))
+        tracemalloc.stop()
+
+if __name__ == "__main__":
+    main()
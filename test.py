@@ -3650,6 +3650,882 @@ class ParserTest(unittest.TestCase):
         dt = myparser.parse("01/Foo/2007")
         self.assertEqual(dt, datetime(2007, 1, 1))
 
+    def testParserInfoClassify(self):
+        info = parserinfo()
+        self.assertEqual(info.classify("SEPT").month, 9)
+        self.assertEqual(info.classify("thursday").weekday, 3)
+        self.assertEqual(info.classify("M").hms, 1)
+        roles = info.classify("m")
+        self.assertTrue(roles.jump)
+        self.assertEqual(roles.hms, 1)
+        roles = info.classify("of")
+        self.assertTrue(roles.jump and roles.pertain)
+        self.assertTrue(info.classify("gmt").utczone)
+        roles = info.classify("foo")
+        self.assertEqual((roles.jump, roles.weekday, roles.month, roles.hms,
+                          roles.ampm, roles.pertain, roles.utczone),
+                         (False, None, None, None, None, False, False))
+
+    def testParserInfoClassifySubclass(self):
+        from dateutil.parser import parser
+        class myparserinfo(parserinfo):
+            JUMP = parserinfo.JUMP+["de"]
+            MONTHS = parserinfo.MONTHS[:]
+            MONTHS[8] = ("Sep", "Septiembre")
+        info = myparserinfo()
+        self.assertTrue(info.classify("de").jump)
+        self.assertEqual(info.classify("septiembre").month, 9)
+        self.assertEqual(parser(info).parse("25 de Septiembre de 2003"),
+                         datetime(2003, 9, 25))
+
+    def testParserInfoClassifyOverriddenMethod(self):
+        from dateutil.parser import parser
+        class myparserinfo(parserinfo):
+            def jump(self, name):
+                return name == "@" or parserinfo.jump(self, name)
+        info = myparserinfo()
+        self.assertTrue(info.classify("@").jump)
+        self.assertEqual(parser(info).parse("2003-09-25 @ 10:49"),
+                         datetime(2003, 9, 25, 10, 49))
+
+    def _localeinfos(self):
+        class spanish(parserinfo):
+            JUMP = parserinfo.JUMP+["de"]
+            WEEKDAYS = [("lun", "lunes"), ("mar", "martes"),
+                        ("mie", "miercoles"), ("jue", "jueves"),
+                        ("vie", "viernes"), ("sab", "sabado"),
+                        ("dom", "domingo")]
+            MONTHS = [("ene", "enero"), ("feb", "febrero"),
+                      ("mar", "marzo"), ("abr", "abril"), ("may", "mayo"),
+                      ("jun", "junio"), ("jul", "julio"),
+                      ("ago", "agosto"), ("sep", "septiembre"),
+                      ("oct", "octubre"), ("nov", "noviembre"),
+                      ("dic", "diciembre")]
+        class german(parserinfo):
+            JUMP = parserinfo.JUMP+["um", "uhr"]
+            WEEKDAYS = [("Montag",), ("Dienstag",), ("Mittwoch",),
+                        ("Donnerstag",), ("Freitag",), ("Samstag",),
+                        ("Sonntag",)]
+            MONTHS = [("Jan", "Januar"), ("Feb", "Februar"),
+                      ("Mrz", "Maerz"), ("Apr", "April"), ("Mai",),
+                      ("Jun", "Juni"), ("Jul", "Juli"), ("Aug", "August"),
+                      ("Sep", "September"), ("Okt", "Oktober"),
+                      ("Nov", "November"), ("Dez", "Dezember")]
+        return [parserinfo(), spanish(dayfirst=True), german(dayfirst=True)]
+
+    def testMultiParserInfo(self):
+        from dateutil.parser import parser
+        p = parser(multiparserinfo(self._localeinfos()))
+        self.assertEqual(p.parse("Mar 5 2003"), datetime(2003, 3, 5))
+        self.assertEqual(p.parse("mar, 4 de marzo de 2003, 10:00"),
+                         datetime(2003, 3, 4, 10))
+        self.assertEqual(p.parse("5. Maerz 2003 um 10:00 Uhr"),
+                         datetime(2003, 3, 5, 10))
+        self.assertEqual(p.parse("Dienstag, 4 Okt 2005"),
+                         datetime(2005, 10, 4))
+
+    def testMultiParserInfoLocaleOrder(self):
+        from dateutil.parser import parser
+        p = parser(multiparserinfo(self._localeinfos()))
+        # No words, so the first locale's order.
+        self.assertEqual(p.parse("01/02/2003"), datetime(2003, 1, 2))
+        # Spanish words, so day first.
+        self.assertEqual(p.parse("lunes 03/02/2003"), datetime(2003, 2, 3))
+        self.assertEqual(p.parse("Montag 03.02.2003"), datetime(2003, 2, 3))
+
+    def testMultiParserInfoOrderOverride(self):
+        from dateutil.parser import parser
+        p = parser(multiparserinfo([parserinfo()], dayfirst=True))
+        self.assertEqual(p.parse("01/02/2003"), datetime(2003, 2, 1))
+        self.assertEqual(p.parse("01/02/2003", dayfirst=False),
+                         datetime(2003, 1, 2))
+        p = parser(multiparserinfo(self._localeinfos(), dayfirst=False,
+                                   yearfirst=True))
+        self.assertEqual(p.parse("lunes 03/02/01"), datetime(2003, 2, 1))
+
+    def testMultiParserInfoLookups(self):
+        info = multiparserinfo(self._localeinfos())
+        # The first locale knowing a name answers for it.
+        self.assertEqual(info.month("mar"), 3)
+        self.assertEqual(info.weekday("mar"), None)
+        self.assertEqual(info.month("enero"), 1)
+        self.assertTrue(info.jump("uhr"))
+        self.assertEqual(info.tzoffset("utc"), 0)
+        self.assertRaises(ValueError, multiparserinfo, [])
+
+    def testRegexLexerMatchesTimelex(self):
+        from dateutil.parser import _timelex, _retimelex
+        for s in ["Thu Sep 25 10:36:28 BRST 2003",
+                  "2003-09-25T10:49:41.5-03:00",
+                  "5:50 A.M. on June 13, 1990",
+                  "10.09.2003 a.m.", "1.a", "1.a ", "1.ab", "a.1", "1.",
+                  "1.5", "a..b", "12\x0034\tfoo\r\n", "0.5h", ""]:
+            self.assertEqual(_retimelex.split(s), _timelex.split(s))
+
+    def testRegexLexerStream(self):
+        from dateutil.parser import _timelex, _retimelex
+        s = "Thu, 25 Sep 2003 10:49:41 -0300"
+        self.assertEqual(_retimelex.split(StringIO(s)), _timelex.split(s))
+
+    def testTimelexSelectable(self):
+        from dateutil.parser import _timelex, parser
+        class timelexparser(parser):
+            _lexer = _timelex
+        self.assertEqual(timelexparser().parse("Thu Sep 25 10:36:28 2003"),
+                         datetime(2003, 9, 25, 10, 36, 28))
+
+    def testShapeCacheReplay(self):
+        from dateutil.parser import parser
+        p = parser()
+        self.assertEqual(p.parse("Thu Sep 25 10:36:28 BRST 2003",
+                                 tzinfos=self.tzinfos),
+                         datetime(2003, 9, 25, 10, 36, 28,
+                                  tzinfo=self.brsttz))
+        self.assertEqual(p.parse("Fri Oct 31 23:59:01 BRST 1997",
+                                 tzinfos=self.tzinfos),
+                         datetime(1997, 10, 31, 23, 59, 1,
+                                  tzinfo=self.brsttz))
+        self.assertEqual(len(p._compiled), 1)
+
+    def testShapeCacheDayFirstYearFirst(self):
+        from dateutil.parser import parser
+        p = parser()
+        for s in ("01/02/03", "13/02/03", "01/13/03", "99/01/02"):
+            for dayfirst in (False, True):
+                for yearfirst in (False, True):
+                    self.assertEqual(p.parse(s, dayfirst=dayfirst,
+                                             yearfirst=yearfirst),
+                                     parse(s, dayfirst=dayfirst,
+                                           yearfirst=yearfirst))
+        self.assertEqual(p.parse("13/02/03", dayfirst=True),
+                         datetime(2003, 2, 13))
+        self.assertEqual(p.parse("01/02/03", yearfirst=True),
+                         datetime(2001, 2, 3))
+
+    def testShapeCacheTzNameReversal(self):
+        from dateutil.parser import parser
+        p = parser()
+        self.assertEqual(p.parse("10:36:28 GMT+3", default=self.default),
+                         datetime(2003, 9, 25, 10, 36, 28,
+                                  tzinfo=tzoffset(None, -10800)))
+        self.assertEqual(p.parse("11:00:00 GMT-2", default=self.default),
+                         datetime(2003, 9, 25, 11, 0, 0,
+                                  tzinfo=tzoffset(None, 7200)))
+
+    def testShapeCacheFailure(self):
+        from dateutil.parser import parser
+        p = parser()
+        self.assertRaises(ValueError, p.parse, "Sep 25 foo")
+        self.assertEqual(p._compiled, {})
+
+    def testISOFastPathMatchesCascade(self):
+        from dateutil.parser import parser
+        class cascadeparser(parser):
+            def _isocompatible(self):
+                return False
+        p = parser()
+        cascade = cascadeparser()
+        for s in ["2014-03-01T12:30:45.123456+01:00",
+                  "2014-03-01T12:30:45.5-0300",
+                  "2014-03-01T12:30:45Z", "2014-03-01 12:30",
+                  "20140301T123045", "20140301T1230+01", "20140301",
+                  "2014-03-01T12", "0099-03-01", "1999-12-31T23:59:59-00:00"]:
+            self.assertNotEqual(p._parseiso(s), None)
+            self.assertEqual(repr(p._parse(s)), repr(cascade._parse(s)))
+
+    def testISOFastPathDatetime(self):
+        from dateutil.parser import parser
+        p = parser()
+        build = parser()
+        build._isodirect = False
+        for s in ["2014-03-01T12:30:45.123456+01:00",
+                  "2014-03-01T12:30:45.5-0300", "2014-03-01T12:30:45,5",
+                  "2014-03-01T12:30:45Z", "2014-03-01T12:30:45z",
+                  "20140301T1230+01", "20140301", "0099-03-01",
+                  "1999-12-31T23:59:59-00:00", "2014-02-30"]:
+            for ignoretz in (False, True):
+                try:
+                    expected = build.parse(s, ignoretz=ignoretz)
+                except ValueError:
+                    self.assertRaises(ValueError, p.parse, s,
+                                      ignoretz=ignoretz)
+                    continue
+                dt = p.parse(s, ignoretz=ignoretz)
+                self.assertEqual(dt, expected)
+                self.assertEqual(repr(dt.tzinfo), repr(expected.tzinfo))
+        self.assertEqual(p._isodatetime("0099-03-01", False), None)
+        self.assertTrue(parser(parserinfo(dayfirst=True))._isodirect)
+        self.assertFalse(parser(self._localeinfos()[1])._isodirect)
+
+    def testISOFastPathDefault(self):
+        self.assertEqual(parse("2014-03-01", default=self.default.replace(
+                                   hour=10, minute=36)),
+                         datetime(2014, 3, 1, 10, 36))
+        self.assertEqual(parse("2014-03-01T12:30:45.5-03:00"),
+                         datetime(2014, 3, 1, 12, 30, 45, 500000,
+                                  tzinfo=tzoffset(None, -10800)))
+
+    def testISOFastPathFallback(self):
+        # Years below 32 are read as day or month by the cascade, so
+        # they must not be taken by the ISO shortcut.
+        from dateutil.parser import parser
+        self.assertEqual(parser()._parseiso("0012-03-01"), None)
+        self.assertEqual(parse("0012-03-01"), datetime(2001, 12, 3))
+
+    def testIsoparse(self):
+        self.assertEqual(isoparse("2014-03-01T12:30:45.123456+01:00"),
+                         datetime(2014, 3, 1, 12, 30, 45, 123456,
+                                  tzinfo=tzoffset(None, 3600)))
+        self.assertEqual(isoparse("20140301T123045Z"),
+                         datetime(2014, 3, 1, 12, 30, 45, tzinfo=tzutc()))
+        self.assertEqual(isoparse("2014-03-01t12:30:45,5z"),
+                         datetime(2014, 3, 1, 12, 30, 45, 500000,
+                                  tzinfo=tzutc()))
+        self.assertEqual(isoparse("2014-03-01"), datetime(2014, 3, 1))
+        self.assertEqual(isoparse("0012-03-01"), datetime(12, 3, 1))
+        self.assertEqual(isoparse("2014-03-01T12:30-00:00").tzinfo, tzutc())
+
+    def testParseMany(self):
+        self.assertEqual(parse_many(["Thu Sep 25 10:36:28 BRST 2003",
+                                     b"2003-09-25T10:49:41",
+                                     "10:36"],
+                                    default=self.default,
+                                    tzinfos=self.tzinfos),
+                         [datetime(2003, 9, 25, 10, 36, 28,
+                                   tzinfo=self.brsttz),
+                          datetime(2003, 9, 25, 10, 49, 41),
+                          datetime(2003, 9, 25, 10, 36)])
+
+    def testParseManyGenerator(self):
+        it = parse_many(["2003-09-25", "2003-09-26"], generator=True)
+        self.assertEqual(next(it), datetime(2003, 9, 25))
+        self.assertEqual(list(it), [datetime(2003, 9, 26)])
+
+    def testParseManyRaises(self):
+        self.assertRaises(ValueError, parse_many, ["2003-09-25", "foo"])
+
+    def testParseManyCoerce(self):
+        self.assertEqual(parse_many(["2003-09-25", "foo", None],
+                                    errors="coerce"),
+                         [datetime(2003, 9, 25), None, None])
+
+    def testParseManyBadOptions(self):
+        # A bad keyword argument is a mistake in the call, not in the
+        # rows, so it isn't coerced.
+        self.assertRaises(TypeError, parse_many, ["2003-09-25", "foo"],
+                          dayfrist=True, errors="coerce")
+        self.assertRaises(TypeError, parse_many_epoch, ["2003-09-25"],
+                          dayfrist=True)
+        self.assertRaises(TypeError, parse_many_fields, ["2003-09-25"],
+                          dayfrist=True)
+
+    def testParseManyCollectErrors(self):
+        errors = []
+        self.assertEqual(parse_many(["foo", "2003-09-25", "13:61"],
+                                    errors=errors),
+                         [None, datetime(2003, 9, 25), None])
+        self.assertEqual([(i, s) for i, s, e in errors],
+                         [(0, "foo"), (2, "13:61")])
+        self.assertTrue(isinstance(errors[0][2], ValueError))
+
+    def testParseManySharesTzinfo(self):
+        calls = []
+        def tzinfos(name, offset):
+            calls.append(name)
+            return "BRST3"
+        l = parse_many(["10:36:28 BRST", "11:00:00 BRST"], tzinfos=tzinfos)
+        self.assertEqual(calls, ["BRST"])
+        self.assertTrue(l[0].tzinfo is l[1].tzinfo)
+
+    def testParseManyParallel(self):
+        strs = ["2003-09-%02d 10:%02d" % (i%28+1, i%60) for i in range(100)]
+        strs.append("Thu Sep 25 10:36:28 BRST 2003")
+        self.assertEqual(parse_many(strs, tzinfos=self.tzinfos,
+                                    workers=2, chunksize=7),
+                         parse_many(strs, tzinfos=self.tzinfos))
+
+    def testParseManyParallelErrors(self):
+        strs = ["2003-09-25", "foo"]*10
+        errors = []
+        l = parse_many(strs, errors=errors, workers=2, chunksize=3)
+        self.assertEqual(l, [datetime(2003, 9, 25), None]*10)
+        self.assertEqual([i for i, s, e in errors], list(range(1, 20, 2)))
+        self.assertRaises(ValueError, parse_many, strs, workers=2)
+
+    def testParseManyEpochParallel(self):
+        strs = ["2003-09-%02d 10:%02d" % (i%28+1, i%60) for i in range(100)]
+        strs += ["Thu Sep 25 10:36:28 BRST 2003", "foo"]
+        self.assertEqual(parse_many_epoch(strs, tzinfos=self.tzinfos,
+                                          workers=2, chunksize=7),
+                         parse_many_epoch(strs, tzinfos=self.tzinfos))
+
+    def testParseEpoch(self):
+        self.assertEqual(parse_epoch("1970-01-01"), 0)
+        self.assertEqual(parse_epoch("2003-09-25T10:49:41.5-03:00"),
+                         1064497781500000)
+        self.assertEqual(parse_epoch("Thu Sep 25 10:36:28 BRST 2003",
+                                     tzinfos=self.tzinfos),
+                         1064496988000000)
+        self.assertEqual(parse_epoch("10:36:28 BRST", ignoretz=True,
+                                     default=self.default),
+                         1064486188000000)
+
+    def testParseEpochMatchesParse(self):
+        from dateutil.parser import _epoch
+        default = datetime(2003, 9, 25, tzinfo=tzoffset(None, 7200))
+        for s in ["Thu Sep 25 10:36:28 2003", "10:36:28 BRST",
+                  "Wed", "2003-09-25 10:49:41 -0300", "10:00 UTC+3"]:
+            self.assertEqual(parse_epoch(s, default=default,
+                                         tzinfos=self.tzinfos),
+                             _epoch(parse(s, default=default,
+                                          tzinfos=self.tzinfos)))
+
+    def testParseManyEpoch(self):
+        a = parse_many_epoch(["1970-01-01T00:00:01Z", "foo", "13:61"])
+        self.assertEqual(list(a), [1000000, -2**63, -2**63])
+        a = parse_many_epoch(["foo"], missing=-1)
+        self.assertEqual(list(a), [-1])
+        self.assertRaises(ValueError, parse_many_epoch, ["foo"],
+                          errors="raise")
+
+    def testParseManyEpochNumpy(self):
+        try:
+            import numpy
+        except ImportError:
+            return
+        a = parse_many_epoch(["1970-01-01T00:00:01Z", "foo"], asnumpy=True)
+        self.assertEqual(a.dtype, numpy.dtype("M8[us]"))
+        self.assertEqual(a[0], numpy.datetime64(1000000, "us"))
+        self.assertTrue(numpy.isnat(a[1]))
+
+    def testParseCache(self):
+        from dateutil.parser import parser
+        p = parser(cachesize=2)
+        dt = p.parse("2003-09-25 10:49:41")
+        self.assertEqual(dt, datetime(2003, 9, 25, 10, 49, 41))
+        self.assertTrue(p.parse("2003-09-25 10:49:41") is dt)
+        self.assertEqual((p.cache.hits, p.cache.misses), (1, 1))
+        self.assertEqual(p.parse("2003-09-25 10:49:41", dayfirst=True), dt)
+        self.assertEqual(p.parse("10:36", default=self.default),
+                         datetime(2003, 9, 25, 10, 36))
+        # The first entry was evicted.
+        self.assertEqual(len(p.cache), 2)
+        self.assertFalse(p.parse("2003-09-25 10:49:41") is dt)
+        p.cache.clear()
+        self.assertEqual((len(p.cache), p.cache.hits, p.cache.misses),
+                         (0, 0, 0))
+
+    def testParseCacheDefaults(self):
+        from dateutil.parser import parser
+        p = parser(cachesize=10)
+        self.assertEqual(p.parse("10:36", default=self.default),
+                         datetime(2003, 9, 25, 10, 36))
+        self.assertEqual(p.parse("10:36",
+                                 default=datetime(2003, 9, 26)),
+                         datetime(2003, 9, 26, 10, 36))
+        self.assertEqual(p.parse("10:36").date(), date.today())
+        self.assertEqual(p.cache.hits, 0)
+
+    def testParseCacheAwareDefaults(self):
+        from dateutil.parser import parser
+        p = parser(cachesize=10)
+        utc = datetime(2003, 9, 25, 13, tzinfo=tzutc())
+        brst = datetime(2003, 9, 25, 10, tzinfo=tzoffset("BRST", -10800))
+        self.assertEqual(utc, brst)
+        self.assertEqual(p.parse("10:36", default=utc).hour, 10)
+        dt = p.parse("2003-09-26", default=brst)
+        self.assertEqual((dt.hour, dt.tzinfo), (10, brst.tzinfo))
+        dt = p.parse("2003-09-26", default=utc)
+        self.assertEqual((dt.hour, dt.tzinfo), (13, utc.tzinfo))
+
+    def testParseCacheUnhashableTzinfos(self):
+        from dateutil.parser import parser
+        p = parser(cachesize=10)
+        s = "Thu Sep 25 10:36:28 BRST 2003"
+        self.assertEqual(p.parse(s, tzinfos=self.tzinfos),
+                         p.parse(s, tzinfos=self.tzinfos))
+        self.assertEqual(len(p.cache), 0)
+
+    def testParseCacheThreads(self):
+        import threading
+        from dateutil.parser import parser
+        # Few entries for many strings, so that threads keep evicting
+        # each other's.
+        p = parser(cachesize=8)
+        strs = ["2003-09-%02d 10:%02d" % (day, day) for day in range(1, 29)]
+        errors = []
+        def run():
+            try:
+                for i in range(300):
+                    for day, s in enumerate(strs, 1):
+                        if p.parse(s) != datetime(2003, 9, day, 10, day):
+                            errors.append(s)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(p.cache), 8)
+
+    def testParseTzCache(self):
+        from dateutil.parser import parser
+        calls = []
+        def tzinfos(name, offset):
+            calls.append(name)
+            return "BRST+3BRDT"
+        p = parser(tzcachesize=2)
+        a = p.parse("2003-09-25 10:00 BRST", tzinfos=tzinfos)
+        b = p.parse_many(["2003-09-26 11:00 BRST"], tzinfos=tzinfos)[0]
+        self.assertTrue(a.tzinfo is b.tzinfo)
+        self.assertEqual(calls, ["BRST"])
+        self.assertEqual((p.tzcache.hits, p.tzcache.misses), (1, 1))
+        p.tzcache.clear()
+        p.parse("2003-09-25 10:00 BRST", tzinfos=tzinfos)
+        self.assertEqual(calls, ["BRST", "BRST"])
+
+    def testParseTzCacheBounded(self):
+        from dateutil.parser import parser
+        p = parser(tzcachesize=2)
+        for s in ["10:00 -0100", "10:00 -0200", "10:00 -0300",
+                  "10:00 BRST"]:
+            p.parse(s, tzinfos=lambda name, offset: offset or -10800)
+        self.assertEqual(len(p.tzcache), 2)
+        p.parse("10:00 -0100", tzinfos={"BRST": -10800})
+        self.assertEqual(len(p.tzcache), 2)
+
+    def testParseTzCacheThreads(self):
+        import threading
+        from dateutil.parser import parser
+        p = parser(tzcachesize=4)
+        offsets = list(range(-12, 13))
+        strs = ["2003-09-25 10:00 %+03d00" % offset for offset in offsets]
+        errors = []
+        def tzinfos(name, offset):
+            return offset
+        def run():
+            try:
+                for i in range(300):
+                    for offset, s in zip(offsets, strs):
+                        dt = p.parse(s, tzinfos=tzinfos)
+                        if dt.utcoffset() != timedelta(hours=offset):
+                            errors.append(s)
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=run) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len(p.tzcache), 4)
+
+    def testParseTzCacheNaive(self):
+        from dateutil.parser import parser
+        p = parser(tzcachesize=2)
+        self.assertEqual(p.parse("2003-09-25"), datetime(2003, 9, 25))
+        self.assertEqual(p.parse("2003-09-25"), datetime(2003, 9, 25))
+        self.assertEqual(p.tzcache.hits, 1)
+
+    def testLRUCache(self):
+        from dateutil.parser import _lrucache
+        c = _lrucache(2)
+        c[1] = "a"
+        c[2] = "b"
+        self.assertEqual(c.get(1), "a")
+        c[3] = "c"
+        self.assertEqual(c.get(2), None)
+        self.assertEqual((c.get(1), c.get(3)), ("a", "c"))
+        self.assertEqual((c.hits, c.misses), (3, 1))
+
+    def testParserStats(self):
+        from dateutil.parser import parser, parserstats
+        stats = parserstats(keep=2)
+        p = parser(stats=stats)
+        for s in ["2003-09-25T10:49:41", "Thu Sep 25 10:36:28 2003",
+                  "Thu Sep 25 10:36:29 2003", "Jan-",
+                  "I saw it on Sep 25 2003", "1064486188"]:
+            p._parse(s, fuzzy=s.startswith("I"), epoch=s.isdigit())
+        # "I", "saw" and "it" were dropped.
+        self.assertEqual((stats.calls, stats.failures, stats.fuzzy),
+                         (6, 1, 3))
+        self.assertEqual(stats.paths, {"iso": 1, "epoch": 1, "scan": 3,
+                                       "replay": 1})
+        self.assertEqual(stats.errors, {"IndexError": 1})
+        self.assertEqual(stats.ops["weekday"], 2)
+        self.assertEqual(stats.tokens[2], 1)
+        self.assertEqual(sum(stats.latency.values()), 6)
+        self.assertEqual(len(stats.slowest()), 2)
+        exported = stats.export()
+        self.assertEqual(exported["latency"], sorted(stats.latency.items()))
+        stats.clear()
+        self.assertEqual(stats.export()["calls"], 0)
+        # Only the tokens dropped count, on scans and replays alike.
+        p._parse("Sep 25 2003", fuzzy=True)
+        p._parse("Sep 25 2003 foo", fuzzy=True)
+        p._parse("Sep 25 2003 foo", fuzzy=True)
+        self.assertEqual(stats.fuzzy, 2)
+        self.assertFalse("skip" in stats.ops)
+
+    def testParserStatsSubclasses(self):
+        from dateutil.parser import streamparser, formatparser, parserstats
+        stats = parserstats()
+        p = streamparser(stats=stats)
+        self.assertEqual(p.parse("Thu Sep 25 10:36:28 2003"),
+                         datetime(2003, 9, 25, 10, 36, 28))
+        p.parse("Thu Sep 25 10:36:29 2003")
+        p = formatparser(["25/09/2003 10:00"], fallback=True, stats=stats)
+        p.parse("26/09/2003 11:00")
+        p.parse("Sep 26 2003")
+        self.assertEqual(stats.paths, {"scan": 1, "stream": 1,
+                                       "format": 1, "fallback": 1})
+
+    def testStreamParser(self):
+        from dateutil.parser import streamparser
+        p = streamparser()
+        for s in ["Thu Sep 25 10:36:28 2003", "Thu Sep 25 10:36:29 2003",
+                  "Thu Sep 25 10:37:00 2003", "Thu Sep 25 10:37:00 2003",
+                  "Fri Sep 26 09:00:00 2003", "Fri Sep 26 9:00:00 2003",
+                  "10:36:28 BRST", "10:36:28 -0300", "10:36:28 -0400",
+                  "Sep 26 2003 9:00 PM", "Sep 26 2003 9:00 AM"]:
+            self.assertEqual(p.parse(s, default=self.default,
+                                     tzinfos=self.tzinfos),
+                             parse(s, default=self.default,
+                                   tzinfos=self.tzinfos))
+
+    def testStreamParserReplaysChangedTokens(self):
+        from dateutil.parser import streamparser
+        p = streamparser()
+        p.parse("25/09/2003 10:36:28", dayfirst=True)
+        p.parse("25/09/2003 10:36:29", dayfirst=True)
+        # Only the operation for the seconds was replayed.
+        self.assertEqual(p._snapshot[3], [25, 9, 2003])
+        self.assertEqual(p.parse("26/09/2003 10:36:29", dayfirst=True),
+                         datetime(2003, 9, 26, 10, 36, 29))
+        p.reset()
+        self.assertEqual(p.parse("26/09/2003 10:36:30", dayfirst=True),
+                         datetime(2003, 9, 26, 10, 36, 30))
+
+    def testParseEpochDigits(self):
+        dt = datetime(2014, 3, 6, tzinfo=tzutc())
+        for s in ["1394064000", "1394064000000", "1394064000000000"]:
+            self.assertEqual(parse(s, epoch=True), dt)
+        self.assertEqual(parse(" 1394064000.123456 ", epoch=True),
+                         dt.replace(microsecond=123456))
+        self.assertEqual(parse("-1000000000", epoch=True),
+                         datetime(1938, 4, 24, 22, 13, 20, tzinfo=tzutc()))
+        self.assertEqual(parse(b"1394064000", epoch=True), dt)
+
+    def testParseEpochBytes(self):
+        from dateutil.parser import parser
+        p = parser()
+        dt = datetime(2014, 3, 6, tzinfo=tzutc())
+        self.assertEqual(p.parse(b"1394064000", epoch=True), dt)
+        self.assertEqual(p.parse(b" 1394064000.5 ", epoch=True),
+                         dt.replace(microsecond=500000))
+        res = p._parse(b"1394064000", epoch=True)
+        self.assertEqual((res.year, res.month, res.day, res.tzoffset),
+                         (2014, 3, 6, 0))
+
+    def testParseEpochKeepsOtherNumbers(self):
+        self.assertEqual(parse("20030925", epoch=True),
+                         datetime(2003, 9, 25))
+        self.assertEqual(parse("200309251036", epoch=True),
+                         datetime(2003, 9, 25, 10, 36))
+        self.assertEqual(parse("Sep 25 2003", epoch=True),
+                         datetime(2003, 9, 25))
+
+    def testParseEpochUnit(self):
+        self.assertEqual(parse("20030925", epoch="s"),
+                         datetime(1970, 8, 20, 20, 8, 45, tzinfo=tzutc()))
+        self.assertEqual(parse("1.5", epoch="ms"),
+                         datetime(1970, 1, 1, 0, 0, 0, 1500,
+                                  tzinfo=tzutc()))
+        self.assertRaises(ValueError, parse, "1", epoch="h")
+
+    def testParseEpochBatch(self):
+        from dateutil.parser import streamparser
+        strs = ["1394064000123", "2014-03-06", "1394064001"]
+        self.assertEqual(list(parse_many_epoch(strs, epoch=True)),
+                         [1394064000123000, 1394064000000000,
+                          1394064001000000])
+        self.assertEqual(streamparser().parse_many(strs[2:], epoch=True),
+                         [datetime(2014, 3, 6, 0, 0, 1, tzinfo=tzutc())])
+
+    def testParseFields(self):
+        res = parse_fields("Thu 10:36 BRST")
+        self.assertEqual((res.year, res.weekday, res.hour, res.minute,
+                          res.second, res.tzname, res.tzoffset),
+                         (None, 3, 10, 36, None, "BRST", None))
+
+    def testParseFieldsOffset(self):
+        res = parse_fields(b"2003-09-25T10:49:41.5-03:00")
+        self.assertEqual((res.year, res.month, res.day, res.microsecond,
+                          res.tzoffset),
+                         (2003, 9, 25, 500000, -10800))
+        self.assertRaises(ValueError, parse_fields, "foo")
+
+    def testParseManyFields(self):
+        import array
+        columns = parse_many_fields(["2003-09-25 10:49:41 UTC", "foo",
+                                     "Thu"])
+        self.assertEqual(sorted(columns),
+                         ["day", "hour", "microsecond", "minute", "month",
+                          "second", "tzname", "tzoffset", "weekday",
+                          "year"])
+        self.assertTrue(isinstance(columns["year"], array.array))
+        self.assertEqual(columns["year"].typecode, "i")
+        self.assertEqual(list(columns["year"]), [2003, -2**31, -2**31])
+        self.assertEqual(list(columns["weekday"]), [-2**31, -2**31, 3])
+        self.assertEqual(list(columns["tzoffset"]), [0, -2**31, -2**31])
+        self.assertEqual(columns["tzname"], ["UTC", None, None])
+
+    def testParseManyFieldsSelected(self):
+        columns = parse_many_fields(["10:36", "10 PM"], fields=["hour"],
+                                    missing=-1)
+        self.assertEqual(list(columns), ["hour"])
+        self.assertEqual(list(columns["hour"]), [10, 22])
+        self.assertRaises(ValueError, parse_many_fields, ["10:36"],
+                          fields=["hours"])
+        self.assertRaises(ValueError, parse_many_fields, ["foo"],
+                          errors="raise")
+
+    def testParseBuffer(self):
+        buf = b"x 2003-09-25T10:49:41.5-03:00 y Sep 25 2003 z"
+        self.assertEqual(parse_buffer(buf, 2, 29),
+                         datetime(2003, 9, 25, 10, 49, 41, 500000,
+                                  tzinfo=tzoffset(None, -10800)))
+        self.assertEqual(parse_buffer(memoryview(buf), 32, 43),
+                         datetime(2003, 9, 25))
+        self.assertEqual(parse_buffer(bytearray(b"2003-09-25")),
+                         datetime(2003, 9, 25))
+        self.assertRaises(ValueError, parse_buffer, buf, 0, 1)
+
+    def testParseBufferMmap(self):
+        import mmap
+        import tempfile
+        with tempfile.TemporaryFile() as f:
+            f.write(b"2003-09-25T10:49:41Z\n20030925 104941\n")
+            f.flush()
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                self.assertEqual(parse_buffer_many(m, [(0, 20), (21, 36)]),
+                                 [datetime(2003, 9, 25, 10, 49, 41,
+                                           tzinfo=tzutc()),
+                                  datetime(2003, 9, 25, 10, 49, 41)])
+            finally:
+                m.close()
+
+    def testParseBufferManyErrors(self):
+        errors = []
+        buf = b"2003-09-25 foo"
+        self.assertEqual(parse_buffer_many(buf, [(0, 10), (11, 14)],
+                                           errors=errors),
+                         [datetime(2003, 9, 25), None])
+        self.assertEqual([i for i, s, e in errors], [1])
+
+    def testIterparse(self):
+        f = StringIO("2003-09-25 10:49:41 start\n"
+                     "2003-09-25 10:50:02 stop\n")
+        self.assertEqual(list(iterparse(f, column=(0, 19))),
+                         [(1, datetime(2003, 9, 25, 10, 49, 41)),
+                          (2, datetime(2003, 9, 25, 10, 50, 2))])
+
+    def testIterparseBinarySmallChunks(self):
+        data = "".join(["x,2003-09-%02d 10:00\n" % d
+                        for d in range(1, 31)]).encode()
+        l = list(iterparse(BytesIO(data), column=1, sep=",", chunksize=7))
+        self.assertEqual(l, [(d, datetime(2003, 9, d, 10))
+                             for d in range(1, 31)])
+
+    def testIterparseColumnWhitespace(self):
+        lines = ["a 10:36:28 b", "c  Sep-25-2003\td"]
+        self.assertEqual(list(iterparse(lines, column=1,
+                                        default=self.default)),
+                         [(1, datetime(2003, 9, 25, 10, 36, 28)),
+                          (2, datetime(2003, 9, 25))])
+
+    def testIterparseRegex(self):
+        import re
+        lines = ["[Thu Sep 25 10:36:28 2003] start",
+                 "no timestamp here",
+                 "[2003-09-25] stop"]
+        errors = []
+        l = list(iterparse(lines, column=re.compile(r"\[(.*?)\]"),
+                           errors=errors))
+        self.assertEqual(l, [(1, datetime(2003, 9, 25, 10, 36, 28)),
+                             (2, None),
+                             (3, datetime(2003, 9, 25))])
+        self.assertEqual([(n, s) for n, s, e in errors],
+                         [(2, "no timestamp here")])
+
+    def testIterparseMissingColumn(self):
+        it = iterparse(["2003-09-25"], column=1)
+        self.assertRaises(ValueError, list, it)
+
+    def _timeindex(self, data, **kwargs):
+        import tempfile
+        with tempfile.TemporaryFile() as f:
+            f.write(data)
+            f.flush()
+            f.seek(0)
+            times, offsets = timeindex(f, **kwargs)
+        return list(times), list(offsets)
+
+    def testTimeindex(self):
+        data = (b"2003-09-25 10:49:41 start\n"
+                b"garbage\n"
+                b"2003-09-25 10:50:02 stop")
+        epoch = calendar.timegm((2003, 9, 25, 10, 49, 41))*1000000
+        self.assertEqual(self._timeindex(data, column=(0, 19)),
+                         ([epoch, epoch+21000000], [0, 34]))
+
+    def testTimeindexMissing(self):
+        data = b"x,2003-09-25\nx\n\nx,2003-09-26\n"
+        epoch = calendar.timegm((2003, 9, 25, 0, 0, 0))*1000000
+        self.assertEqual(self._timeindex(data, column=1, sep=",",
+                                         missing=-1),
+                         ([epoch, -1, -1, epoch+86400000000],
+                          [0, 13, 15, 16]))
+
+    def testTimeindexColumnWhitespace(self):
+        data = b" a 10:36:28\tb\r\nc  10:49:41\r\n"
+        self.assertEqual(self._timeindex(data, column=1,
+                                         recordsep=b"\r\n",
+                                         default=datetime(1970, 1, 1)),
+                         ([38188000000, 38981000000], [0, 15]))
+
+    def testTimeindexRegexAndErrors(self):
+        import re
+        data = b"[1970-01-02] a\nno timestamp\n"
+        errors = []
+        column = re.compile(b"\\[(.*)\\]")
+        self.assertEqual(self._timeindex(data, column=column, errors=errors),
+                         ([86400000000], [0]))
+        self.assertEqual([(k, s) for k, s, e in errors], [(15, (15, 27))])
+        self.assertRaises(ValueError, self._timeindex, data,
+                          column=(1, 11), errors="raise")
+
+    def testTimeindexEmpty(self):
+        self.assertEqual(self._timeindex(b""), ([], []))
+
+    def testTimeindexEmptyRecordsep(self):
+        self.assertRaises(ValueError, self._timeindex, b"2003-09-25\n",
+                          recordsep=b"")
+
+    def testInferformatDayfirst(self):
+        p = inferformat(["13/01/2003 10:00", "02/01/2003 23:15"])
+        self.assertEqual((p.dayfirst, p.yearfirst), (True, False))
+        self.assertEqual(p.parse("05/12/2003 10:00"),
+                         datetime(2003, 12, 5, 10))
+
+    def testInferformatAmbiguousKeepsDefault(self):
+        p = inferformat(["01/02/2003"])
+        self.assertEqual((p.dayfirst, p.yearfirst), (False, False))
+        self.assertEqual(p.parse("03/04/2003"), datetime(2003, 3, 4))
+
+    def testInferformatRejectsDeviations(self):
+        p = inferformat(["13/01/2003 10:00"])
+        for s in ["01/13/2003 10:00", "2003-01-13 10:00", "13/1/2003 10:00",
+                  "13/01/2003"]:
+            self.assertRaises(ValueError, p.parse, s)
+
+    def testInferformatFallback(self):
+        p = inferformat(["13/01/2003 10:00"], fallback=True)
+        self.assertEqual(p.parse("2003-01-13 10:00"),
+                         datetime(2003, 1, 13, 10))
+        self.assertEqual(p.parse("01/13/2003 10:00"),
+                         datetime(2003, 1, 13, 10))
+
+    def testInferformatNames(self):
+        p = inferformat(["Thu Sep 25 10:36:28 BRST 2003",
+                         "Fri Sep 26 10:36:28 BRT 2003"])
+        self.assertEqual(p.parse("Mon Oct 06 01:02:03 EST 2003",
+                                 ignoretz=True),
+                         datetime(2003, 10, 6, 1, 2, 3))
+        # A month where the weekday should be.
+        self.assertRaises(ValueError, p.parse,
+                          "Jan Oct 06 01:02:03 EST 2003")
+
+    def testInferformatMany(self):
+        p = inferformat(["2003-09-25T10:49:41.5-03:00"])
+        self.assertEqual(p.parse_many(["2003-09-25T10:49:41.5+01:00",
+                                       "2003-09-25T10:49:41-03:00"],
+                                      errors="coerce"),
+                         [datetime(2003, 9, 25, 10, 49, 41, 500000,
+                                   tzinfo=tzoffset(None, 3600)),
+                          None])
+
+    def testInferformatInconsistentSamples(self):
+        self.assertRaises(ValueError, inferformat,
+                          ["2003-09-25", "Sep 25 2003"])
+        self.assertRaises(ValueError, inferformat,
+                          ["05/20/2003", "20/05/2003"])
+        self.assertRaises(ValueError, inferformat, ["foo"])
+        self.assertRaises(ValueError, inferformat, [])
+
+    def testSearchDates(self):
+        text = ("Hi, on Thursday, September 25, 2003 at 10:49 PM we got "
+                "order 123456 (ref 42).\nCall 555-1234 about the "
+                "2003-09-26T10:00:00Z meeting. Version 1.5 is out.")
+        self.assertEqual([(text[s:e], d) for s, e, d in search_dates(text)],
+                         [("Thursday, September 25, 2003 at 10:49 PM",
+                           datetime(2003, 9, 25, 22, 49)),
+                          ("2003-09-26T10:00:00Z",
+                           datetime(2003, 9, 26, 10, tzinfo=tzutc()))])
+
+    def testSearchDatesDefault(self):
+        text = "between the 10th and 12th of October, from 3pm"
+        self.assertEqual(search_dates(text, default=self.default),
+                         [(21, 36, datetime(2003, 10, 12)),
+                          (43, 46, datetime(2003, 9, 25, 15))])
+
+    def testSearchDatesNothing(self):
+        self.assertEqual(search_dates(""), [])
+        self.assertEqual(search_dates("May I have 10 a day, 5 and 6?"), [])
+
+    def testSearchDatesLongText(self):
+        text = "x"*1000+" 25 Sep 2003 "+"word "*1000+"10:36:28"
+        self.assertEqual([d for s, e, d in search_dates(text,
+                                                        default=self.default)],
+                         [datetime(2003, 9, 25),
+                          datetime(2003, 9, 25, 10, 36, 28)])
+
+    def testSearchDatesDenseTextScalesLinearly(self):
+        from dateutil.parser import parser
+        class countingparser(parser):
+            calls = 0
+            def _parse(self, timestr, **kwargs):
+                countingparser.calls += 1
+                return parser._parse(self, timestr, **kwargs)
+        def spans(n):
+            countingparser.calls = 0
+            text = "value 12/3 and 4:5 pm, "*n
+            self.assertEqual(len(countingparser().search_dates(text)), 2*n)
+            return countingparser.calls
+        # Every date is found with the same few tries, however much
+        # text surrounds it.
+        self.assertEqual(spans(2000), 8*spans(250))
+
+    def testSearchDatesAmPmWithoutHour(self):
+        self.assertEqual(search_dates("Please reply by 12/3 pm.",
+                                      default=self.default),
+                         [(16, 20, datetime(2003, 12, 3))])
+        self.assertEqual(search_dates("Call at 10:00 or 3/4 pm",
+                                      default=self.default),
+                         [(8, 13, datetime(2003, 9, 25, 10)),
+                          (17, 20, datetime(2003, 3, 4))])
+        self.assertRaises(ValueError, parse, "3/4 pm")
+        self.assertEqual(parse("3/4 pm", fuzzy=True, default=self.default),
+                         datetime(2003, 3, 4))
+
+    def testIsoparseRejectsNonISO(self):
+        for s in ["Thu Sep 25 10:36:28 2003", "2014-03-01T12:3045",
+                  "2014-0301", "2014-03-01T12:30:45 ", "2014-03-01+01:00"]:
+            self.assertRaises(ValueError, isoparse, s)
+
 
 class EasterTest(unittest.TestCase):
     easterlist = [
@@ -3926,11 +4802,77 @@ END:VTIMEZONE
         self.assertEqual(tzstr("EST5EDT"),
                          tzrange("EST", -18000, "EDT"))
 
+    def testStrInterned(self):
+        from dateutil.tz import _lrucache
+        cache = tzstr.cache
+        tzstr.cache = _lrucache(2)
+        try:
+            tz1 = tzstr("EST5EDT")
+            self.assertTrue(tzstr("EST5EDT") is tz1)
+            self.assertFalse(tzstr("EST5") is tz1)
+            tzstr("GMT+3")
+            self.assertEqual(len(tzstr.cache), 2)
+            self.assertFalse(tzstr("EST5EDT") is tz1)
+            self.assertEqual(tzstr("EST5EDT"), tz1)
+            self.assertEqual((tzstr.cache.hits, tzstr.cache.misses), (2, 4))
+        finally:
+            tzstr.cache = cache
+
+    def testStrImmutable(self):
+        tz = tzstr("EST5EDT")
+        self.assertRaises(AttributeError, setattr, tz, "_std_abbr", "XST")
+        self.assertEqual(tz.tzname(datetime(2003, 1, 1)), "EST")
+
     def testFileStart1(self):
         tz = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
         self.assertEqual(datetime(2003, 4, 6, 1, 59, tzinfo=tz).tzname(), "EST")
         self.assertEqual(datetime(2003, 4, 6, 2, 00, tzinfo=tz).tzname(), "EDT")
         
+    def testFileDst(self):
+        tz = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
+        for dt, dst in [(datetime(1900, 7, 1), timedelta(0)),
+                        (datetime(2003, 4, 6, 1, 59), timedelta(0)),
+                        (datetime(2003, 4, 6, 2, 00), timedelta(hours=1)),
+                        (datetime(2003, 10, 26, 0, 59), timedelta(hours=1)),
+                        (datetime(2003, 10, 26, 1, 00), timedelta(0)),
+                        (datetime(2040, 7, 1), timedelta(0))]:
+            self.assertEqual(tz.dst(dt), dst)
+            self.assertEqual(tz.utcoffset(dt)-tz.dst(dt),
+                             timedelta(hours=-5))
+
+    def testFileFromUTC(self):
+        tz = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
+        for utc, local in [(datetime(2003, 4, 6, 6, 59),
+                            datetime(2003, 4, 6, 1, 59)),
+                           (datetime(2003, 4, 6, 7, 00),
+                            datetime(2003, 4, 6, 3, 00)),
+                           (datetime(2003, 10, 26, 5, 59),
+                            datetime(2003, 10, 26, 1, 59)),
+                           (datetime(2003, 10, 26, 6, 00),
+                            datetime(2003, 10, 26, 1, 00))]:
+            dt = utc.replace(tzinfo=tzutc()).astimezone(tz)
+            self.assertEqual(dt.replace(tzinfo=None), local)
+            self.assertTrue(dt.tzinfo is tz)
+        dt = datetime(2003, 4, 6, 7, 00, tzinfo=tzutc()).astimezone(tz)
+        self.assertEqual(dt.tzname(), "EDT")
+        self.assertRaises(ValueError, tz.fromutc, datetime(2003, 1, 1))
+
+    def testFileSharedTTInfo(self):
+        tz1 = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
+        tz2 = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
+        self.assertEqual(len(tz1._ttinfo_list), 4)
+        self.assertTrue(tz1._ttinfo_list[0] is tz2._ttinfo_list[0])
+        self.assertEqual(tz1, tz2)
+
+    def testFileFromBuffer(self):
+        data = base64.decodestring(self.TZFILE_EST5EDT)
+        tz = tzfile(BytesIO(data))
+        for buf in [bytearray(data), memoryview(data)]:
+            self.assertEqual(tzfile(buf), tz)
+        self.assertEqual(tzfile(bytearray(data), "EST5EDT")._filename,
+                         "EST5EDT")
+        self.assertRaises(ValueError, tzfile, bytearray(b"TZ"))
+
     def testFileEnd1(self):
         tz = tzfile(BytesIO(base64.decodestring(self.TZFILE_EST5EDT)))
         self.assertEqual(datetime(2003, 10, 26, 0, 59, tzinfo=tz).tzname(), "EDT")
@@ -3983,6 +4925,33 @@ END:VTIMEZONE
         # bug 892569
         str(gettz('UTC'))
 
+    def testGettzCache(self):
+        import tempfile
+        from dateutil import tz
+        cache, checkmtime = tz.GETTZ_CACHE, tz.GETTZ_CHECKMTIME
+        tz.GETTZ_CACHE = tz._lrucache(2)
+        fd, path = tempfile.mkstemp()
+        try:
+            os.write(fd, base64.decodestring(self.TZFILE_EST5EDT))
+            os.close(fd)
+            zone = gettz(path)
+            self.assertTrue(gettz(path) is zone)
+            self.assertEqual(gettz("Nowhere/Unknown"), None)
+            self.assertEqual(gettz("Nowhere/Unknown"), None)
+            self.assertEqual((tz.GETTZ_CACHE.hits, tz.GETTZ_CACHE.misses),
+                             (2, 2))
+            mtime = os.stat(path).st_mtime
+            os.utime(path, (mtime+10, mtime+10))
+            self.assertTrue(gettz(path) is zone)
+            tz.GETTZ_CHECKMTIME = True
+            self.assertFalse(gettz(path) is zone)
+            self.assertEqual(gettz(path), zone)
+            tz.GETTZ_CACHE.resize(0)
+            self.assertEqual(len(tz.GETTZ_CACHE), 0)
+        finally:
+            os.remove(path)
+            tz.GETTZ_CACHE, tz.GETTZ_CHECKMTIME = cache, checkmtime
+
     def testBrokenIsDstHandling(self):
         # tzrange._isdst() was using a date() rather than a datetime().
         # Issue reported by Lennart Regebro.